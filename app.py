@@ -7,7 +7,10 @@ Integrated with Context Manager and Persona Manager MCPs for intelligent AI assi
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 from flask_cors import CORS
 import os
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 
 # Import MCP integration
@@ -32,6 +35,15 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+
+# Hand records to a background listener so request threads don't block on log I/O
+_root_logger = logging.getLogger()
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Initialize Database
@@ -53,6 +65,9 @@ except Exception as e:
 # Initialize Landscaping Materials Calculator
 try:
     materials_calculator = LandscapingMaterials()
+    if db:
+        # Load materials in the background so the first calculation is not a cold start
+        materials_calculator.prewarm(app)
     logger.info("Landscaping Materials Calculator initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize Materials Calculator: {e}")
@@ -559,9 +574,9 @@ def ai_chat():
         # Process the user query with AI agent
         response = ai_agent.process_user_query(user_message, user_context)
         
-        logger.info(f"AI chat processed: {response.get('persona', {}).get('name', 'Unknown')} persona used")
+        logger.info(f"AI chat processed: {response.persona_name or 'Unknown'} persona used")
         
-        return jsonify(response)
+        return app.response_class(response.to_json(), mimetype='application/json')
         
     except Exception as e:
         logger.error(f"AI chat error: {e}")
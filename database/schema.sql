@@ -236,6 +236,7 @@ CREATE INDEX idx_job_time_entries_crew_member_id ON job_time_entries(crew_member
 CREATE INDEX idx_job_time_entries_date ON job_time_entries(date);
 CREATE INDEX idx_equipment_status ON equipment(status);
 CREATE INDEX idx_equipment_assigned_to ON equipment(assigned_to);
+CREATE INDEX idx_equipment_is_active ON equipment(is_active);
 CREATE INDEX idx_crew_members_role ON crew_members(role);
 CREATE INDEX idx_crew_members_is_active ON crew_members(is_active);
 
@@ -5,15 +5,52 @@ This module contains information about common landscaping materials used in wall
 including dimensions, coverage, and calculation methods for determining quantities needed.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, NamedTuple, Optional, Tuple
 from enum import Enum
-import math
+import functools
+from math import ceil
 import logging
+import threading
+import time
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Unit conversions, folded into multipliers for the calculators
+_SQ_INCHES_PER_SQ_FT = 144.0
+_CUBIC_INCHES_PER_CUBIC_YARD = 46656.0  # 36" x 36" x 36"
+_SQ_FT_PER_SQ_INCH = 1.0 / _SQ_INCHES_PER_SQ_FT
+_CUBIC_YARDS_PER_CUBIC_INCH = 1.0 / _CUBIC_INCHES_PER_CUBIC_YARD
+
+# Estimated unit costs (dollars) for supporting materials
+_COST_ESTIMATES = {
+    "gravel_base_cubic_yards": 25.00,
+    "sand_bed_cubic_yards": 30.00,
+    "mortar_bags": 8.00,
+    "rebar_pieces": 5.00,
+    "landscape_fabric_square_feet": 0.50,
+    "drainage_pipe_feet": 3.00,
+    "stone_fill_tons": 35.00,
+    "geotextile_square_feet": 2.00
+}
+
+# Base installation time estimates (hours per 100 sq ft)
+_INSTALL_TIME_PER_100_SQFT = {
+    "retaining_wall_blocks": 8,
+    "pavers": 12,
+    "stone": 20,
+    "concrete": 15,
+    "brick": 18,
+    "timber": 6,
+    "gabion": 4
+}
+
+# Age (seconds) after which loaded materials are refreshed in the background
+_MATERIALS_TTL_SECONDS = 15 * 60
+
+# Maximum number of memoized wall calculations kept per calculator instance
+_CALCULATION_CACHE_SIZE = 512
+
 
 class MaterialType(Enum):
     """Types of landscaping materials."""
@@ -30,8 +67,19 @@ class MaterialType(Enum):
     OTHER = "other"
 
 
-@dataclass
-class MaterialSpec:
+# Database material_type strings mapped to MaterialType
+_DB_TYPE_TO_ENUM = {
+    'concrete': MaterialType.CONCRETE,
+    'stone': MaterialType.STONE,
+    'brick': MaterialType.BRICK,
+    'block': MaterialType.BLOCK,
+    'wood': MaterialType.WOOD,
+    'metal': MaterialType.METAL,
+    'other': MaterialType.OTHER
+}
+
+
+class MaterialSpec(NamedTuple):
     """Specifications for a landscaping material."""
     id: str
     name: str
@@ -47,84 +95,315 @@ class MaterialSpec:
     installation_notes: str
 
 
+def _course_grid(span_inches: float, rise_inches: float,
+                 unit_length: float, unit_height: float) -> Tuple[int, int, int]:
+    """Lay units in courses; returns (units_per_course, courses, total_units)."""
+    units_per_course = ceil(span_inches / unit_length)
+    courses = ceil(rise_inches / unit_height)
+    return units_per_course, courses, units_per_course * courses
+
+
+def _retaining_wall_blocks(material: MaterialSpec, wall_length_inches: float,
+                           wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for retaining wall blocks."""
+    blocks_per_course, courses, total_blocks = _course_grid(
+        wall_length_inches, wall_height_inches, material.length, material.height)
+    
+    calculations = {
+        "blocks_per_course": blocks_per_course,
+        "number_of_courses": courses,
+        "total_blocks": total_blocks
+    }
+    materials_needed = {
+        "primary_blocks": total_blocks,
+        "gravel_base_cubic_yards": round(wall_length_inches * material.width * 6 * _CUBIC_YARDS_PER_CUBIC_INCH, 2),  # 6" base
+        "sand_bed_cubic_yards": round(wall_length_inches * material.width * 2 * _CUBIC_YARDS_PER_CUBIC_INCH, 2)     # 2" sand
+    }
+    return calculations, materials_needed
+
+
+def _paver_wall(material: MaterialSpec, wall_length_inches: float,
+                wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for paver walls."""
+    # Pavers are typically used for low walls (2-3 courses max)
+    pavers_per_course, courses, _ = _course_grid(
+        wall_length_inches, wall_height_inches, material.length, material.height)
+    courses = min(courses, 3)
+    total_pavers = pavers_per_course * courses
+    
+    calculations = {
+        "pavers_per_course": pavers_per_course,
+        "number_of_courses": courses,
+        "total_pavers": total_pavers
+    }
+    materials_needed = {
+        "pavers": total_pavers,
+        "sand_base_cubic_yards": round(wall_length_inches * material.width * 4 * _CUBIC_YARDS_PER_CUBIC_INCH, 2),
+        "paver_sand_cubic_yards": round(wall_length_inches * material.width * 1 * _CUBIC_YARDS_PER_CUBIC_INCH, 2)
+    }
+    return calculations, materials_needed
+
+
+def _stone_wall(material: MaterialSpec, wall_length_inches: float,
+                wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for stone walls."""
+    # Stone walls are irregular, estimate based on coverage
+    stones_needed = ceil(wall_area_sq_ft / material.coverage_per_unit)
+    
+    calculations = {
+        "wall_area_square_feet": round(wall_area_sq_ft, 2),
+        "estimated_stones": stones_needed
+    }
+    materials_needed = {
+        "stone_blocks": stones_needed,
+        "mortar_bags": -(-stones_needed // 10),  # Estimate: ceil(10% of stones)
+        "gravel_base_cubic_yards": round(wall_length_inches * 12 * 6 * _CUBIC_YARDS_PER_CUBIC_INCH, 2)
+    }
+    return calculations, materials_needed
+
+
+def _concrete_block_wall(material: MaterialSpec, wall_length_inches: float,
+                         wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for concrete block walls."""
+    # Check for valid dimensions and use defaults if needed
+    length = material.length if material.length else 16.0
+    height = material.height if material.height else 8.0
+    width = material.width if material.width else 8.0
+    
+    logger.info("Calculating concrete block wall with dimensions: length=%s, height=%s, width=%s",
+                length, height, width)
+    logger.info("Wall dimensions: %s x %s inches", wall_length_inches, wall_height_inches)
+    
+    blocks_per_course, courses, total_blocks = _course_grid(
+        wall_length_inches, wall_height_inches, length, height)
+    
+    logger.info("Concrete block calculation: blocks_per_course=%s, courses=%s, total_blocks=%s",
+                blocks_per_course, courses, total_blocks)
+    
+    calculations = {
+        "blocks_per_course": blocks_per_course,
+        "number_of_courses": courses,
+        "total_blocks": total_blocks
+    }
+    
+    # Block counts are integers, so ceil with integer floor division
+    mortar_bags = -(-total_blocks * 3 // 10)  # ceil(30% of blocks)
+    rebar_pieces = ceil(wall_length_inches / 48)  # Every 4 feet
+    concrete_footings = round(wall_length_inches * 12 * 8 * _CUBIC_YARDS_PER_CUBIC_INCH, 2)
+    
+    logger.info("Materials calculation: mortar_bags=%s, rebar_pieces=%s, concrete_footings=%s",
+                mortar_bags, rebar_pieces, concrete_footings)
+    
+    materials_needed = {
+        "concrete_blocks": total_blocks,
+        "mortar_bags": mortar_bags,
+        "rebar_pieces": rebar_pieces,
+        "concrete_footings_cubic_yards": concrete_footings
+    }
+    return calculations, materials_needed
+
+
+def _brick_wall(material: MaterialSpec, wall_length_inches: float,
+                wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for brick walls."""
+    # Standard brick wall with 3/8" mortar joints
+    bricks_per_course, courses, total_bricks = _course_grid(
+        wall_length_inches, wall_height_inches, material.length + 0.375, material.height + 0.375)
+    
+    calculations = {
+        "bricks_per_course": bricks_per_course,
+        "number_of_courses": courses,
+        "total_bricks": total_bricks
+    }
+    materials_needed = {
+        "bricks": total_bricks,
+        "mortar_bags": -(-total_bricks // 20),  # ceil(5% of bricks)
+        "sand_cubic_yards": round(total_bricks * 0.001, 2)
+    }
+    return calculations, materials_needed
+
+
+def _timber_wall(material: MaterialSpec, wall_length_inches: float,
+                 wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for timber walls."""
+    # Timber walls are typically 6" high per course
+    timbers_per_course, courses, timbers_needed = _course_grid(
+        wall_length_inches, wall_height_inches, material.length, material.height)
+    
+    calculations = {
+        "timbers_per_course": timbers_per_course,
+        "number_of_courses": courses,
+        "total_timbers": timbers_needed
+    }
+    materials_needed = {
+        "landscape_timbers": timbers_needed,
+        "rebar_pieces": timbers_needed * 2,  # 2 per timber
+        "gravel_base_cubic_yards": round(wall_length_inches * 6 * 4 * _CUBIC_YARDS_PER_CUBIC_INCH, 2)
+    }
+    return calculations, materials_needed
+
+
+def _gabion_wall(material: MaterialSpec, wall_length_inches: float,
+                 wall_height_inches: float, wall_area_sq_ft: float) -> Tuple[Dict, Dict]:
+    """Calculate quantities for gabion walls."""
+    # Gabion baskets are typically 3' x 3' x 6'
+    baskets_length, baskets_height, total_baskets = _course_grid(
+        wall_length_inches, wall_height_inches, material.length, material.height)
+    
+    # Stone fill (typically 1.5 tons per cubic yard)
+    stone_cubic_yards = total_baskets * (material.length * material.width * material.height) * _CUBIC_YARDS_PER_CUBIC_INCH
+    
+    calculations = {
+        "baskets_length": baskets_length,
+        "baskets_height": baskets_height,
+        "total_baskets": total_baskets,
+        "stone_cubic_yards": round(stone_cubic_yards, 2)
+    }
+    materials_needed = {
+        "gabion_baskets": total_baskets,
+        "stone_fill_tons": round(stone_cubic_yards * 1.5, 1),
+        "geotextile_square_feet": round(wall_length_inches * 12 * _SQ_FT_PER_SQ_INCH, 0)
+    }
+    return calculations, materials_needed
+
+
+def _base_materials(wall_length_feet: float, wall_height_feet: float) -> Dict:
+    """Common base materials for a wall, sized from its dimensions in feet."""
+    return {
+        "landscape_fabric_square_feet": round(wall_length_feet * 2, 0),  # 2' wide strip
+        "drainage_pipe_feet": round(wall_length_feet, 0) if wall_height_feet > 3 else 0
+    }
+
+
+@functools.lru_cache(maxsize=256)
+def _compute_install_time(material_type: str, wall_area: float) -> int:
+    """Estimated installation hours for a wall area (sq ft) of the given material type value."""
+    base_time = _INSTALL_TIME_PER_100_SQFT.get(material_type, 10)
+    return max(1, round((wall_area / 100) * base_time))
+
+
+# Wall calculator for each material type, paired with the materials_needed
+# key that holds the primary material quantity
+_WALL_STRATEGIES = {
+    MaterialType.CONCRETE: (_concrete_block_wall, "concrete_blocks"),
+    MaterialType.BLOCK: (_concrete_block_wall, "concrete_blocks"),
+    MaterialType.STONE: (_stone_wall, "stone_blocks"),
+    MaterialType.BRICK: (_brick_wall, "bricks"),
+    MaterialType.WOOD: (_timber_wall, "landscape_timbers"),
+    MaterialType.TIMBER: (_timber_wall, "landscape_timbers"),
+    MaterialType.RETAINING_WALL_BLOCKS: (_retaining_wall_blocks, "primary_blocks"),
+    MaterialType.PAVERS: (_paver_wall, "pavers"),
+    MaterialType.GABION: (_gabion_wall, "gabion_baskets"),
+}
+
+# Unknown types default to the concrete block calculation
+_DEFAULT_WALL_STRATEGY = _WALL_STRATEGIES[MaterialType.CONCRETE]
+
+
+class _WallPlan(NamedTuple):
+    """The per-material part of a wall calculation, shared by walls of one material."""
+    material: MaterialSpec
+    calculate_wall: Callable
+    primary_material: Dict[str, Any]  # The result's primary_material section; copy before use
+    with_cap: bool
+    cap_material: Optional[MaterialSpec]
+
+
 class LandscapingMaterials:
     """Database of landscaping materials with calculation methods."""
     
     def __init__(self):
         self.materials = {}  # Will be populated on-demand
+        self._materials_by_type = {}  # MaterialType -> List[MaterialSpec], rebuilt on load
         self._materials_loaded = False
+        self._materials_version = 0  # Bumped whenever self.materials is reloaded
+        self._calculation_cache = {}
+        self._loaded_at = 0.0
+        self._app = None  # Flask app used for background refreshes
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._materials_ready = threading.Event()  # Set once a background load finishes
     
-    def _load_materials_from_database(self):
+    def _load_materials_from_database(self) -> Dict[str, MaterialSpec]:
         """Load materials from the database and convert to MaterialSpec objects."""
         try:
             from flask import current_app
+            from models.base import db
             from models.material import Material
             
             # Check if we're in a Flask app context
             if current_app:
-                db_materials = Material.query.filter_by(is_active=True).all()
-                logger.info(f"Loading {len(db_materials)} materials from database")
+                # Select only the columns MaterialSpec needs; the lightweight Row
+                # tuples skip ORM identity-map and attribute instrumentation
+                db_materials = db.session.query(
+                    Material.id,
+                    Material.name,
+                    Material.material_type,
+                    Material.length_inches,
+                    Material.width_inches,
+                    Material.height_inches,
+                    Material.weight_lbs,
+                    Material.price_per_unit,
+                    Material.description,
+                    Material.use_case,
+                    Material.installation_notes
+                ).filter_by(is_active=True).all()
+                logger.info("Loading %d materials from database", len(db_materials))
                 
+                materials = {}
                 for db_material in db_materials:
-                    # Convert database material to MaterialSpec
-                    material_spec = self._convert_db_material_to_spec(db_material)
-                    if material_spec:
-                        self.materials[str(db_material.id)] = material_spec
-                        logger.info(f"Loaded material: {db_material.name} (ID: {db_material.id})")
-                    else:
-                        logger.warning(f"Failed to convert material: {db_material.name} (ID: {db_material.id})")
-                        
-                logger.info(f"Total materials loaded: {len(self.materials)}")
+                    # Convert database material to MaterialSpec, skipping rows that fail
+                    try:
+                        materials[str(db_material.id)] = self._convert_db_material_to_spec(db_material)
+                    except Exception as e:
+                        logger.warning("Failed to convert material: %s (ID: %s): %s", db_material.name, db_material.id, e)
+                        continue
+                    logger.info("Loaded material: %s (ID: %s)", db_material.name, db_material.id)
+                
+                logger.info("Total materials loaded: %d", len(materials))
+                return materials
             else:
                 logger.warning("No Flask app context available, using fallback materials")
-                self.materials = self._initialize_fallback_materials()
+                return self._initialize_fallback_materials()
                     
         except Exception as e:
-            logger.error(f"Error loading materials from database: {e}")
-            # Fallback to hardcoded materials if database fails
-            self.materials = self._initialize_fallback_materials()
+            logger.error("Error loading materials from database: %s", e)
+            # Keep serving previously loaded (stale) materials if we have them,
+            # otherwise fallback to hardcoded materials
+            return self.materials or self._initialize_fallback_materials()
     
     def _convert_db_material_to_spec(self, db_material) -> MaterialSpec:
-        """Convert a database Material to a MaterialSpec."""
-        try:
-            # Map database material_type to our enum
-            material_type_map = {
-                'concrete': MaterialType.CONCRETE,
-                'stone': MaterialType.STONE,
-                'brick': MaterialType.BRICK,
-                'block': MaterialType.BLOCK,
-                'wood': MaterialType.WOOD,
-                'metal': MaterialType.METAL,
-                'other': MaterialType.OTHER
-            }
-            
-            material_type = material_type_map.get(db_material.material_type, MaterialType.OTHER)
-            
-            # Calculate coverage per unit based on dimensions
-            length = float(db_material.length_inches) if db_material.length_inches else 0
-            width = float(db_material.width_inches) if db_material.width_inches else 0
-            height = float(db_material.height_inches) if db_material.height_inches else 0
-            
-            # For wall materials, coverage is length * height
-            coverage_per_unit = (length * height) / 144.0 if length and height else 0.5
-            
-            return MaterialSpec(
-                id=db_material.id,
-                name=db_material.name,
-                material_type=material_type,
-                length=length,
-                width=width,
-                height=height,
-                weight=db_material.weight_lbs or 0,
-                coverage_per_unit=coverage_per_unit,
-                price_per_unit=db_material.price_per_unit or 0,
-                description=db_material.description or "",
-                use_case=db_material.use_case or "",
-                installation_notes=db_material.installation_notes or ""
-            )
-        except Exception as e:
-            logger.error(f"Error converting material {db_material.id}: {e}")
-            return None
+        """
+        Convert a database Material (model instance or column Row) to a MaterialSpec.
+        
+        Nullable columns fall back to defaults; malformed values raise so the
+        caller can skip the row.
+        """
+        # Map database material_type to our enum
+        material_type = _DB_TYPE_TO_ENUM.get(db_material.material_type, MaterialType.OTHER)
+        
+        # Calculate coverage per unit based on dimensions
+        length = float(db_material.length_inches or 0)
+        width = float(db_material.width_inches or 0)
+        height = float(db_material.height_inches or 0)
+        
+        # For wall materials, coverage is length * height
+        coverage_per_unit = (length * height) * _SQ_FT_PER_SQ_INCH if length and height else 0.5
+        
+        return MaterialSpec(
+            id=db_material.id,
+            name=db_material.name,
+            material_type=material_type,
+            length=length,
+            width=width,
+            height=height,
+            weight=db_material.weight_lbs or 0,
+            coverage_per_unit=coverage_per_unit,
+            price_per_unit=db_material.price_per_unit or 0,
+            description=db_material.description or "",
+            use_case=db_material.use_case or "",
+            installation_notes=db_material.installation_notes or ""
+        )
     
     def _initialize_fallback_materials(self) -> Dict[str, MaterialSpec]:
         """Initialize fallback materials if database fails."""
@@ -179,23 +458,75 @@ class LandscapingMaterials:
         }
     
     def _ensure_materials_loaded(self):
-        """Ensure materials are loaded from database."""
+        """Ensure materials are loaded from database, refreshing stale materials in the background."""
         if not self._materials_loaded:
-            self._load_materials_from_database()
-            self._materials_loaded = True
+            if self._refreshing:
+                # A prewarm is already loading them; wait for it instead of
+                # querying the database a second time
+                self._materials_ready.wait()
+            if not self._materials_loaded:
+                self._refresh_materials()
+        elif self._app is not None and time.monotonic() - self._loaded_at > _MATERIALS_TTL_SECONDS:
+            # Serve the stale materials while a background thread reloads them
+            self._start_background_refresh()
+    
+    def _refresh_materials(self):
+        """Reload materials and invalidate calculations derived from them."""
+        materials = self._load_materials_from_database()
+        materials_by_type = {}
+        for material in materials.values():
+            materials_by_type.setdefault(material.material_type, []).append(material)
+        
+        # Everything is built before anything is published, so readers never
+        # see a partial load. Materials go first: a calculation that read the
+        # old version can only be cached in the old cache, which is dropped.
+        self.materials = materials
+        self._materials_by_type = materials_by_type
+        self._loaded_at = time.monotonic()
+        self._materials_version += 1
+        self._calculation_cache = {}
+        self._materials_loaded = True
+    
+    def prewarm(self, app):
+        """Load materials in the background so the first request skips the database roundtrip."""
+        self._app = app
+        self._start_background_refresh()
+    
+    def _start_background_refresh(self):
+        """Start a background refresh unless one is already running."""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="materials-refresh", daemon=True).start()
+    
+    def _background_refresh(self):
+        """Reload materials inside the app context of the owning Flask app."""
+        try:
+            with self._app.app_context():
+                self._refresh_materials()
+        except Exception as e:
+            logger.error("Error refreshing materials: %s", e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+            # Wake callers waiting on the first load even if it failed; they
+            # load the materials themselves
+            self._materials_ready.set()
     
     def get_material(self, material_id: str) -> MaterialSpec:
         """Get a specific material by ID."""
         self._ensure_materials_loaded()
-        logger.info(f"Looking for material with ID: {material_id}")
-        logger.info(f"Available material IDs: {list(self.materials.keys())}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Looking for material with ID: %s", material_id)
+            logger.info("Available material IDs: %s", list(self.materials.keys()))
         # Convert material_id to string for comparison
         material_id_str = str(material_id)
         return self.materials.get(material_id_str)
     
     def get_materials_by_type(self, material_type: MaterialType) -> List[MaterialSpec]:
-        """Get all materials of a specific type."""
-        return [mat for mat in self.materials.values() if mat.material_type == material_type]
+        """Get all materials of a specific type (the returned list is shared; do not mutate it)."""
+        return self._materials_by_type.get(material_type, [])
     
     def get_all_materials(self) -> List[MaterialSpec]:
         """Get all available materials."""
@@ -220,16 +551,96 @@ class LandscapingMaterials:
         Returns:
             Dictionary with material calculations
         """
+        self._ensure_materials_loaded()
+        
+        # Results are a pure function of the inputs and the loaded materials,
+        # so repeated quotes are served from the memoized result
+        cache_key = (wall_length, wall_height, str(material_id),
+                     bool(include_base), bool(include_cap), self._materials_version)
+        calculation_cache = self._calculation_cache
+        cached = calculation_cache.get(cache_key)
+        if cached is None:
+            cached = self._compute_wall_materials(wall_length, wall_height, material_id,
+                                                  include_base, include_cap)
+            if len(calculation_cache) >= _CALCULATION_CACHE_SIZE:
+                # Evict the oldest entry (dicts preserve insertion order)
+                calculation_cache.pop(next(iter(calculation_cache)))
+            calculation_cache[cache_key] = cached
+        
+        # Callers are free to mutate the returned dictionary; its sections only
+        # hold scalars, so copying them one level deep is enough
+        return {key: value.copy() if isinstance(value, (dict, list)) else value
+                for key, value in cached.items()}
+    
+    def calculate_wall_materials_batch(self,
+                                       walls: List[Tuple[float, float, str]],
+                                       include_base: bool = True,
+                                       include_cap: bool = True) -> List[Dict[str, Any]]:
+        """
+        Calculate materials for many walls at once, e.g. for a project pricing grid.
+        
+        Args:
+            walls: List of (wall_length, wall_height, material_id) tuples, dimensions in feet
+            include_base: Whether to include base materials
+            include_cap: Whether to include cap materials
+            
+        Returns:
+            List of material calculations in the same order as walls
+        """
+        self._ensure_materials_loaded()
+        
+        # The material lookup, calculator, primary material section and cap
+        # block search are done once per material; each wall then only runs
+        # its own arithmetic, skipping the calculation cache and its copies
+        plans = {}
+        results = []
+        for wall_length, wall_height, material_id in walls:
+            plan = plans.get(material_id)
+            if plan is None:
+                plan = plans[material_id] = self._plan_wall(material_id, include_cap)
+            results.append(self._wall_result(plan, wall_length, wall_height, include_base))
+        return results
+    
+    def _compute_wall_materials(self, wall_length: float, wall_height: float, material_id: str,
+                                include_base: bool, include_cap: bool) -> Dict[str, Any]:
+        """Calculate materials needed for a landscape wall without memoization."""
+        return self._wall_result(self._plan_wall(material_id, include_cap), wall_length, wall_height, include_base)
+    
+    def _plan_wall(self, material_id: str, include_cap: bool) -> _WallPlan:
+        """Work out the parts of a wall calculation that depend only on the material."""
         try:
             material = self.get_material(material_id)
             if not material:
                 raise ValueError(f"Material {material_id} not found")
             
+            calculate_wall, _ = _WALL_STRATEGIES.get(material.material_type, _DEFAULT_WALL_STRATEGY)
+            primary_material = {
+                "name": material.name,
+                "type": material.material_type.value,
+                "dimensions": f"{material.length}\" x {material.width}\" x {material.height}\"",
+                "weight_per_unit": material.weight,
+                "price_per_unit": material.price_per_unit
+            }
+            # Cap blocks only go on concrete and block walls
+            with_cap = include_cap and material.material_type in [MaterialType.CONCRETE, MaterialType.BLOCK]
+            cap_material = self._find_cap_material() if with_cap else None
+            return _WallPlan(material, calculate_wall, primary_material, with_cap, cap_material)
+        except Exception as e:
+            logger.error("Error in calculate_wall_materials: %s", e)
+            raise
+    
+    def _wall_result(self, plan: _WallPlan, wall_length: float, wall_height: float,
+                     include_base: bool) -> Dict[str, Any]:
+        """Calculate materials needed for one wall of a planned material."""
+        try:
+            material = plan.material
+            
             # Convert wall dimensions to inches
             wall_length_inches = wall_length * 12
             wall_height_inches = wall_height * 12
+            wall_area_sq_ft = wall_length * wall_height
             
-            logger.info(f"Starting calculation for wall: {wall_length}' x {wall_height}'")
+            logger.info("Starting calculation for wall: %s' x %s'", wall_length, wall_height)
             
             # Calculate materials needed
             results = {
@@ -237,15 +648,10 @@ class LandscapingMaterials:
                     "length_feet": wall_length,
                     "height_feet": wall_height,
                     "length_inches": wall_length_inches,
-                    "height_inches": wall_height_inches
-                },
-                "primary_material": {
-                    "name": material.name,
-                    "type": material.material_type.value,
-                    "dimensions": f"{material.length}\" x {material.width}\" x {material.height}\"",
-                    "weight_per_unit": material.weight,
-                    "price_per_unit": material.price_per_unit
+                    "height_inches": wall_height_inches,
+                    "area_sq_ft": wall_area_sq_ft
                 },
+                "primary_material": plan.primary_material.copy(),
                 "calculations": {},
                 "materials_needed": {},
                 "cost_breakdown": {},
@@ -253,331 +659,110 @@ class LandscapingMaterials:
             }
         
             # Calculate primary material quantities based on material type
-            if material.material_type in [MaterialType.CONCRETE, MaterialType.BLOCK]:
-                self._calculate_concrete_block_wall(results, material, wall_length_inches, wall_height_inches)
-            elif material.material_type == MaterialType.STONE:
-                self._calculate_stone_wall(results, material, wall_length_inches, wall_height_inches)
-            elif material.material_type == MaterialType.BRICK:
-                self._calculate_brick_wall(results, material, wall_length_inches, wall_height_inches)
-            elif material.material_type == MaterialType.WOOD:
-                self._calculate_timber_wall(results, material, wall_length_inches, wall_height_inches)
-            else:
-                # Default to concrete block calculation for unknown types
-                self._calculate_concrete_block_wall(results, material, wall_length_inches, wall_height_inches)
+            calculations, wall_materials = plan.calculate_wall(
+                material, wall_length_inches, wall_height_inches, wall_area_sq_ft)
+            
+            # Add base materials if requested (base materials are sized in feet)
+            base_materials = _base_materials(wall_length, wall_height) if include_base else {}
             
-            # Add base materials if requested
-            if include_base:
-                self._add_base_materials(results, wall_length, wall_height)
+            # Add cap materials if requested (cap blocks are sized in inches)
+            cap_materials, cap_costs = {}, {}
+            if plan.with_cap:
+                cap_materials, cap_costs = self._cap_materials(wall_length_inches, plan.cap_material)
             
-            # Add cap materials if requested
-            if include_cap and material.material_type in [MaterialType.CONCRETE, MaterialType.BLOCK]:
-                self._add_cap_materials(results, wall_length_inches)
+            results["calculations"] = calculations
+            results["materials_needed"] = {**wall_materials, **base_materials, **cap_materials}
             
             # Calculate total costs
-            self._calculate_total_costs(results)
+            self._calculate_total_costs(results, material, cap_costs)
             
             # Add installation notes
+            installation_hours = self._estimate_installation_time(material.material_type.value, wall_area_sq_ft)
             results["installation_notes"].extend([
                 material.installation_notes,
-                f"Wall area: {wall_length * wall_height:.1f} square feet",
-                f"Estimated installation time: {self._estimate_installation_time(results)} hours"
+                f"Wall area: {wall_area_sq_ft:.1f} square feet",
+                f"Estimated installation time: {installation_hours} hours"
             ])
             
             return results
         except Exception as e:
-            logger.error(f"Error in calculate_wall_materials: {e}")
+            logger.error("Error in calculate_wall_materials: %s", e)
             raise
     
-    def _calculate_retaining_wall_blocks(self, results: Dict, material: MaterialSpec, 
-                                       wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for retaining wall blocks."""
-        # Calculate blocks per course
-        blocks_per_course = math.ceil(wall_length_inches / material.length)
-        
-        # Calculate number of courses
-        courses = math.ceil(wall_height_inches / material.height)
-        
-        # Total blocks needed
-        total_blocks = blocks_per_course * courses
-        
-        results["calculations"] = {
-            "blocks_per_course": blocks_per_course,
-            "number_of_courses": courses,
-            "total_blocks": total_blocks
-        }
-        
-        results["materials_needed"] = {
-            "primary_blocks": total_blocks,
-            "gravel_base_cubic_yards": round(wall_length_inches * material.width * 6 / 46656, 2),  # 6" base
-            "sand_bed_cubic_yards": round(wall_length_inches * material.width * 2 / 46656, 2)     # 2" sand
-        }
-    
-    def _calculate_paver_wall(self, results: Dict, material: MaterialSpec,
-                            wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for paver walls."""
-        # Pavers are typically used for low walls (2-3 courses max)
-        courses = min(math.ceil(wall_height_inches / material.height), 3)
-        pavers_per_course = math.ceil(wall_length_inches / material.length)
-        total_pavers = pavers_per_course * courses
-        
-        results["calculations"] = {
-            "pavers_per_course": pavers_per_course,
-            "number_of_courses": courses,
-            "total_pavers": total_pavers
-        }
-        
-        results["materials_needed"] = {
-            "pavers": total_pavers,
-            "sand_base_cubic_yards": round(wall_length_inches * material.width * 4 / 46656, 2),
-            "paver_sand_cubic_yards": round(wall_length_inches * material.width * 1 / 46656, 2)
-        }
-    
-    def _calculate_stone_wall(self, results: Dict, material: MaterialSpec,
-                            wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for stone walls."""
-        # Stone walls are irregular, estimate based on coverage
-        wall_area_sq_ft = (wall_length_inches * wall_height_inches) / 144
-        stones_needed = math.ceil(wall_area_sq_ft / material.coverage_per_unit)
-        
-        results["calculations"] = {
-            "wall_area_square_feet": round(wall_area_sq_ft, 2),
-            "estimated_stones": stones_needed
-        }
-        
-        results["materials_needed"] = {
-            "stone_blocks": stones_needed,
-            "mortar_bags": math.ceil(stones_needed * 0.1),  # Estimate
-            "gravel_base_cubic_yards": round(wall_length_inches * 12 * 6 / 46656, 2)
-        }
-    
-    def _calculate_concrete_block_wall(self, results: Dict, material: MaterialSpec,
-                                       wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for concrete block walls."""
-        # Check for valid dimensions and use defaults if needed
-        length = material.length if material.length else 16.0
-        height = material.height if material.height else 8.0
-        width = material.width if material.width else 8.0
-        
-        logger.info(f"Calculating concrete block wall with dimensions: length={length}, height={height}, width={width}")
-        logger.info(f"Wall dimensions: {wall_length_inches} x {wall_height_inches} inches")
-        
-        blocks_per_course = math.ceil(wall_length_inches / length)
-        courses = math.ceil(wall_height_inches / height)
-        total_blocks = blocks_per_course * courses
-        
-        logger.info(f"Concrete block calculation: blocks_per_course={blocks_per_course}, courses={courses}, total_blocks={total_blocks}")
-        
-        results["calculations"] = {
-            "blocks_per_course": blocks_per_course,
-            "number_of_courses": courses,
-            "total_blocks": total_blocks
-        }
-        
-        # Calculate materials needed with logging
-        mortar_bags = math.ceil(total_blocks * 0.3)
-        rebar_pieces = math.ceil(wall_length_inches / 48)  # Every 4 feet
-        concrete_footings = round(wall_length_inches * 12 * 8 / 46656, 2)
-        
-        logger.info(f"Materials calculation: mortar_bags={mortar_bags}, rebar_pieces={rebar_pieces}, concrete_footings={concrete_footings}")
-        
-        results["materials_needed"] = {
-            "concrete_blocks": total_blocks,
-            "mortar_bags": mortar_bags,
-            "rebar_pieces": rebar_pieces,
-            "concrete_footings_cubic_yards": concrete_footings
-        }
-    
-    def _calculate_brick_wall(self, results: Dict, material: MaterialSpec,
-                            wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for brick walls."""
-        # Standard brick wall with mortar joints
-        bricks_per_course = math.ceil(wall_length_inches / (material.length + 0.375))  # + mortar
-        courses = math.ceil(wall_height_inches / (material.height + 0.375))  # + mortar
-        total_bricks = bricks_per_course * courses
-        
-        results["calculations"] = {
-            "bricks_per_course": bricks_per_course,
-            "number_of_courses": courses,
-            "total_bricks": total_bricks
-        }
-        
-        results["materials_needed"] = {
-            "bricks": total_bricks,
-            "mortar_bags": math.ceil(total_bricks * 0.05),
-            "sand_cubic_yards": round(total_bricks * 0.001, 2)
-        }
-    
-    def _calculate_timber_wall(self, results: Dict, material: MaterialSpec,
-                             wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for timber walls."""
-        # Timber walls are typically 6" high per course
-        courses = math.ceil(wall_height_inches / material.height)
-        timbers_needed = math.ceil(wall_length_inches / material.length) * courses
-        
-        results["calculations"] = {
-            "timbers_per_course": math.ceil(wall_length_inches / material.length),
-            "number_of_courses": courses,
-            "total_timbers": timbers_needed
-        }
-        
-        results["materials_needed"] = {
-            "landscape_timbers": timbers_needed,
-            "rebar_pieces": timbers_needed * 2,  # 2 per timber
-            "gravel_base_cubic_yards": round(wall_length_inches * 6 * 4 / 46656, 2)
-        }
-    
-    def _calculate_gabion_wall(self, results: Dict, material: MaterialSpec,
-                             wall_length_inches: float, wall_height_inches: float):
-        """Calculate quantities for gabion walls."""
-        # Gabion baskets are typically 3' x 3' x 6'
-        baskets_length = math.ceil(wall_length_inches / material.length)
-        baskets_height = math.ceil(wall_height_inches / material.height)
-        total_baskets = baskets_length * baskets_height
-        
-        # Stone fill (typically 1.5 tons per cubic yard)
-        stone_cubic_yards = total_baskets * (material.length * material.width * material.height) / 46656
-        
-        results["calculations"] = {
-            "baskets_length": baskets_length,
-            "baskets_height": baskets_height,
-            "total_baskets": total_baskets,
-            "stone_cubic_yards": round(stone_cubic_yards, 2)
-        }
-        
-        results["materials_needed"] = {
-            "gabion_baskets": total_baskets,
-            "stone_fill_tons": round(stone_cubic_yards * 1.5, 1),
-            "geotextile_square_feet": round(wall_length_inches * 12 / 144, 0)
-        }
-    
-    def _add_base_materials(self, results: Dict, wall_length: float, wall_height: float):
-        """Add base materials to the calculation."""
-        if "materials_needed" not in results:
-            results["materials_needed"] = {}
-        
-        # Add common base materials
-        results["materials_needed"].update({
-            "landscape_fabric_square_feet": round(wall_length * 2, 0),  # 2' wide strip
-            "drainage_pipe_feet": round(wall_length, 0) if wall_height > 3 else 0
-        })
-    
-    def _add_cap_materials(self, results: Dict, wall_length_inches: float):
-        """Add cap materials for retaining wall blocks."""
-        # Find cap block material
-        cap_material = None
+    def _find_cap_material(self) -> Optional[MaterialSpec]:
+        """Return the first material named as a cap block, or None."""
         for material in self.materials.values():
             if "cap" in material.name.lower():
-                cap_material = material
-                break
-        
+                return material
+        return None
+    
+    def _cap_materials(self, wall_length_inches: float,
+                       cap_material: Optional[MaterialSpec]) -> Tuple[Dict, Dict]:
+        """Cap materials for retaining wall blocks; returns (materials_needed, costs)."""
         if cap_material and cap_material.length and cap_material.length > 0:
-            cap_blocks = math.ceil(wall_length_inches / cap_material.length)
-            results["materials_needed"]["cap_blocks"] = cap_blocks
-            if "cost_breakdown" not in results:
-                results["cost_breakdown"] = {}
-            results["cost_breakdown"]["cap_blocks"] = cap_blocks * cap_material.price_per_unit
-            logger.info(f"Added cap materials: {cap_blocks} cap blocks")
-        else:
-            logger.info("No suitable cap material found, skipping cap materials")
-    
-    def _calculate_total_costs(self, results: Dict):
-        """Calculate total material costs."""
+            cap_blocks = ceil(wall_length_inches / cap_material.length)
+            logger.info("Added cap materials: %s cap blocks", cap_blocks)
+            return {"cap_blocks": cap_blocks}, {"cap_blocks": cap_blocks * cap_material.price_per_unit}
+        
+        logger.info("No suitable cap material found, skipping cap materials")
+        return {}, {}
+    
+    def _calculate_total_costs(self, results: Dict, primary_material: MaterialSpec,
+                               extra_costs: Optional[Dict[str, float]] = None):
+        """Calculate total material costs, including any already-priced extra materials."""
         logger.info("Starting total cost calculation")
         total_cost = 0
         cost_breakdown = {}
         
-        # Get the primary material from the results
-        primary_material_name = results["primary_material"]["name"]
-        logger.info(f"Primary material: {primary_material_name}")
-        
-        # Find the material in our database
-        primary_material = None
-        for material in self.materials.values():
-            if material.name == primary_material_name:
-                primary_material = material
-                break
-        
-        logger.info(f"Found primary material: {primary_material.name if primary_material else 'None'}")
+        logger.info("Primary material: %s", primary_material.name if primary_material else 'None')
         
         if primary_material:
             # Get the primary quantity based on material type
-            primary_quantity = 0
-            if primary_material.material_type in [MaterialType.CONCRETE, MaterialType.BLOCK]:
-                primary_quantity = results["materials_needed"].get("concrete_blocks", 0)
-            elif primary_material.material_type == MaterialType.STONE:
-                primary_quantity = results["materials_needed"].get("stone_blocks", 0)
-            elif primary_material.material_type == MaterialType.BRICK:
-                primary_quantity = results["materials_needed"].get("bricks", 0)
-            elif primary_material.material_type == MaterialType.WOOD:
-                primary_quantity = results["materials_needed"].get("landscape_timbers", 0)
-            else:
-                # Default to first material in the list
-                primary_quantity = next(iter(results["materials_needed"].values()), 0)
+            _, primary_key = _WALL_STRATEGIES.get(primary_material.material_type, _DEFAULT_WALL_STRATEGY)
+            primary_quantity = results["materials_needed"].get(primary_key, 0)
             
-            logger.info(f"Primary quantity: {primary_quantity}")
+            logger.info("Primary quantity: %s", primary_quantity)
             
             # Check for zero quantity
             if primary_quantity <= 0:
-                logger.warning(f"Primary quantity is {primary_quantity}, using minimum value of 1")
+                logger.warning("Primary quantity is %s, using minimum value of 1", primary_quantity)
                 primary_quantity = 1
             
-            logger.info(f"Calculating primary cost: {primary_quantity} * {primary_material.price_per_unit}")
+            logger.info("Calculating primary cost: %s * %s", primary_quantity, primary_material.price_per_unit)
             primary_cost = float(primary_quantity * primary_material.price_per_unit)
             cost_breakdown["primary_material"] = round(primary_cost, 2)
             total_cost += primary_cost
-            logger.info(f"Primary cost: ${primary_cost}")
+            logger.info("Primary cost: $%s", primary_cost)
         
         # Add other material costs (estimates)
-        cost_estimates = {
-            "gravel_base_cubic_yards": 25.00,
-            "sand_bed_cubic_yards": 30.00,
-            "mortar_bags": 8.00,
-            "rebar_pieces": 5.00,
-            "landscape_fabric_square_feet": 0.50,
-            "drainage_pipe_feet": 3.00,
-            "stone_fill_tons": 35.00,
-            "geotextile_square_feet": 2.00
+        logger.info("Calculating additional material costs")
+        additional_costs = {
+            material_name: quantity * _COST_ESTIMATES[material_name]
+            for material_name, quantity in results["materials_needed"].items()
+            if material_name in _COST_ESTIMATES
         }
+        cost_breakdown.update(additional_costs)
+        total_cost = sum(additional_costs.values(), total_cost)
         
-        logger.info("Calculating additional material costs")
-        for material_name, quantity in results["materials_needed"].items():
-            if material_name in cost_estimates:
-                cost = quantity * cost_estimates[material_name]
-                cost_breakdown[material_name] = cost
-                total_cost += cost
-                logger.info(f"Additional cost for {material_name}: {quantity} * ${cost_estimates[material_name]} = ${cost}")
+        if extra_costs:
+            cost_breakdown.update(extra_costs)
+            total_cost = sum(extra_costs.values(), total_cost)
         
         results["cost_breakdown"] = cost_breakdown
         results["total_estimated_cost"] = round(total_cost, 2)
-        logger.info(f"Total estimated cost: ${total_cost}")
+        logger.info("Total estimated cost: $%s", total_cost)
     
-    def _estimate_installation_time(self, results: Dict) -> int:
-        """Estimate installation time in hours."""
-        wall_area = results["wall_specifications"]["length_feet"] * results["wall_specifications"]["height_feet"]
-        
-        logger.info(f"Estimating installation time for wall area: {wall_area} sq ft")
+    def _estimate_installation_time(self, material_type: str, wall_area: float) -> int:
+        """Estimate installation time in hours for a wall area in square feet."""
+        logger.info("Estimating installation time for wall area: %s sq ft", wall_area)
         
         # Check for zero wall area
         if wall_area <= 0:
-            logger.warning(f"Wall area is {wall_area}, using minimum value of 1")
+            logger.warning("Wall area is %s, using minimum value of 1", wall_area)
             wall_area = 1.0
         
-        # Base time estimates (hours per 100 sq ft)
-        time_per_100_sqft = {
-            "retaining_wall_blocks": 8,
-            "pavers": 12,
-            "stone": 20,
-            "concrete": 15,
-            "brick": 18,
-            "timber": 6,
-            "gabion": 4
-        }
-        
-        material_type = results["primary_material"]["type"]
-        base_time = time_per_100_sqft.get(material_type, 10)
-        
-        estimated_time = max(1, round((wall_area / 100) * base_time))
-        logger.info(f"Estimated installation time: {estimated_time} hours")
+        estimated_time = _compute_install_time(material_type, wall_area)
+        logger.info("Estimated installation time: %s hours", estimated_time)
         
         return estimated_time
 
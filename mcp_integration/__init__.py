@@ -3,13 +3,34 @@ MCP Integration for Landscaper Project
 
 This module provides integration with the Context Manager and Persona Manager MCPs
 for enhanced AI agent capabilities in the landscaper web application.
+
+The client classes and __version__ are imported lazily on first attribute access
+(PEP 562), so importing the package does not load every client module.
 """
 
-from .context_manager_client import ContextManagerClient
-from .persona_manager_client import PersonaManagerClient
-from .ai_agent import LandscaperAIAgent
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "ContextManagerClient": "context_manager_client",
+    "SQLiteContextBackend": "context_sqlite",
+    "PersonaManagerClient": "persona_manager_client",
+    "LandscaperAIAgent": "ai_agent",
+    "__version__": "_version",
+}
+
+__all__ = ["ContextManagerClient", "SQLiteContextBackend", "PersonaManagerClient", "LandscaperAIAgent"]
+
 
-__version__ = "1.0.0"
-__all__ = ["ContextManagerClient", "PersonaManagerClient", "LandscaperAIAgent"]
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+        # Cache on the package so later lookups skip __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
@@ -0,0 +1,21 @@
+"""
+Shared HTTP session for the MCP clients.
+
+All clients talk to the MCP server through one pooled requests.Session so
+connections are kept alive and reused across client instances.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts for MCP server calls
+DEFAULT_TIMEOUT = (3.05, 10)
+
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
+
+def session() -> requests.Session:
+    """Return the process-wide MCP HTTP session."""
+    return _session
@@ -7,129 +7,92 @@ to provide intelligent, context-aware assistance for the landscaper web applicat
 
 import json
 import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-from pathlib import Path
 
 from .context_manager_client import ContextManagerClient
 from .persona_manager_client import PersonaManagerClient
 
-logger = logging.getLogger(__name__)
+try:
+    import orjson
+except ImportError:  # orjson is optional; to_json falls back to the stdlib encoder
+    orjson = None
 
+logger = logging.getLogger(__name__)
 
-class LandscaperAIAgent:
-    """AI Agent that uses Context Manager and Persona Manager MCPs."""
-    
-    def __init__(self, project_name: str = "landscaper"):
-        self.project_name = project_name
-        self.context_manager = ContextManagerClient(project_name)
-        self.persona_manager = PersonaManagerClient()
-        
-        # Initialize agent state
-        self.current_persona = None
-        self.conversation_context = {}
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        logger.info(f"LandscaperAIAgent initialized with session ID: {self.session_id}")
-    
-    def process_user_query(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """
-        Process a user query using the appropriate persona and context.
-        
-        Args:
-            query: The user's question or request
-            user_context: Additional context about the user or situation
-            
-        Returns:
-            Dictionary containing the response and metadata
-        """
-        try:
-            # Add query to conversation history
-            self.context_manager.add_conversation_entry(
-                role="user",
-                content=query,
-                metadata={
-                    "session_id": self.session_id,
-                    "user_context": user_context or {},
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
-            
-            # Select the best persona for this query
-            selected_persona, confidence = self.persona_manager.select_best_persona(
-                task=query,
-                context=user_context
-            )
-            
-            if not selected_persona:
-                return self._create_error_response("No suitable persona found for this query")
-            
-            # Update current persona
-            self.current_persona = selected_persona
-            
-            # Generate response based on persona and context
-            response = self._generate_response(query, selected_persona, user_context)
-            
-            # Add response to conversation history
-            self.context_manager.add_conversation_entry(
-                role="assistant",
-                content=response["content"],
-                metadata={
-                    "session_id": self.session_id,
-                    "persona_used": selected_persona["id"],
-                    "confidence": confidence,
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
-            
-            return {
-                "success": True,
-                "response": response["content"],
-                "persona": {
-                    "id": selected_persona["id"],
-                    "name": selected_persona["name"],
-                    "confidence": confidence
-                },
-                "metadata": {
-                    "session_id": self.session_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "query_type": self._classify_query(query),
-                    "response_type": response["type"]
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing user query: {e}")
-            return self._create_error_response(f"An error occurred while processing your request: {str(e)}")
-    
-    def _generate_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate a response based on the selected persona and context."""
-        persona_id = persona["id"]
-        query_lower = query.lower()
-        
-        # Get project context for additional information
-        project_context = self.context_manager.get_context_summary()
-        
-        # Generate persona-specific responses
-        if persona_id == "customer_service_rep":
-            return self._generate_customer_service_response(query, persona, user_context)
-        elif persona_id == "landscaping_expert":
-            return self._generate_landscaping_expert_response(query, persona, user_context)
-        elif persona_id == "sales_specialist":
-            return self._generate_sales_response(query, persona, user_context)
-        elif persona_id == "technical_support":
-            return self._generate_technical_support_response(query, persona, user_context)
-        elif persona_id == "emergency_responder":
-            return self._generate_emergency_response(query, persona, user_context)
-        else:
-            return self._generate_generic_response(query, persona, user_context)
+# Matches the number of entries the context manager keeps in its history
+_HISTORY_LIMIT = 50
+
+# Upper bound on cached (persona, keywords) -> response entries per agent
+_RESPONSE_CACHE_SIZE = 1024
+
+# Seconds the agent reuses its copy of the persona catalog and statistics
+_PERSONA_CACHE_TTL = 60.0
+
+# Keyword groups used to route queries. Keywords are matched as substrings of
+# the lowercased query, so stems like "plant" and "book" also catch "plants"
+# and "booking".
+_GREETING_KW = frozenset({"hello", "hi", "help"})
+_SERVICE_GREETING_KW = _GREETING_KW | {"service"}
+_PRICING_KW = frozenset({"price", "cost", "quote", "estimate"})
+_SCHEDULING_KW = frozenset({"appointment", "schedule", "book"})
+_DESIGN_KW = frozenset({"plant", "garden", "design", "landscape"})
+_MAINTENANCE_KW = frozenset({"maintenance", "care", "fertilizer", "pruning"})
+_PACKAGE_KW = frozenset({"package", "service", "plan"})
+_WEB_KW = frozenset({"website", "app", "mobile"})
+_WEB_SUPPORT_KW = _WEB_KW | {"browser"}
+_TECH_SUPPORT_KW = _WEB_KW | {"technical"}
+_EMERGENCY_KW = frozenset({"emergency", "urgent", "storm", "damage"})
+_EMERGENCY_RESPONSE_KW = _EMERGENCY_KW | {"dangerous"}
+# Query types in priority order; the first group with a match wins
+_QUERY_TYPES = (
+    (_GREETING_KW, "greeting"),
+    (_PRICING_KW, "pricing"),
+    (_SCHEDULING_KW, "scheduling"),
+    (_DESIGN_KW, "technical"),
+    (_EMERGENCY_KW, "emergency"),
+    (_TECH_SUPPORT_KW, "technical_support"),
+)
+# Hard-signal words that route straight to a persona without scoring every
+# persona; checked in priority order, so an urgent pricing question still
+# reaches the emergency responder. Unlike the keyword groups above these are
+# whole words, so "brainstorm" or "priceless" is not a hard signal.
+_PERSONA_ROUTES = (
+    (frozenset({"emergency", "emergencies", "urgent", "storm", "storms"}), "emergency_responder"),
+    (frozenset({"price", "prices", "quote", "quotes"}), "sales_specialist"),
+    (frozenset({"appointment", "appointments"}), "customer_service_rep"),
+)
+_ALL_KEYWORDS = (_SERVICE_GREETING_KW | _PRICING_KW | _SCHEDULING_KW | _DESIGN_KW | _MAINTENANCE_KW
+                 | _PACKAGE_KW | _WEB_SUPPORT_KW | _TECH_SUPPORT_KW | _EMERGENCY_RESPONSE_KW)
+
+
+@lru_cache(maxsize=2048)
+def _keywords_in(query_lower: str) -> frozenset:
+    """
+    Return every routing keyword found in a lowercased query.
     
-    def _generate_customer_service_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate customer service response."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["hello", "hi", "help", "service"]):
-            content = f"""Hello! I'm your friendly customer service representative. I'm here to help you with all your landscaping needs. 
+    The query is scanned once up front; routing branches then test keyword
+    groups with set intersections instead of rescanning the text.
+    """
+    return frozenset(word for word in _ALL_KEYWORDS if word in query_lower)
+
+
+@lru_cache(maxsize=2048)
+def _words_in(query_lower: str) -> frozenset:
+    """Return the words of a lowercased query, for matching against _PERSONA_ROUTES."""
+    return frozenset(re.findall(r"[a-z]+", query_lower))
+
+
+# Canned responses, by persona and topic
+_CS_GREETING = """Hello! I'm your friendly customer service representative. I'm here to help you with all your landscaping needs. 
 
 How can I assist you today? I can help you with:
 • Service information and pricing
@@ -138,9 +101,8 @@ How can I assist you today? I can help you with:
 • Resolving any concerns you might have
 
 What would you like to know about our landscaping services?"""
-            
-        elif any(word in query_lower for word in ["appointment", "schedule", "book"]):
-            content = """I'd be happy to help you schedule an appointment! 
+
+_CS_APPOINTMENT = """I'd be happy to help you schedule an appointment! 
 
 To get started, I'll need to know:
 • What type of service you're interested in
@@ -149,9 +111,8 @@ To get started, I'll need to know:
 • Any specific requirements or concerns
 
 You can also call us directly at 555-0123 or email us at info@landscaper.com for immediate assistance."""
-            
-        elif any(word in query_lower for word in ["price", "cost", "quote", "estimate"]):
-            content = """I'd be happy to provide you with pricing information! Our services include:
+
+_CS_PRICING = """I'd be happy to provide you with pricing information! Our services include:
 
 🌿 **Lawn Care**: Starting at $50/month
 🌳 **Tree Services**: Starting at $75/tree  
@@ -159,9 +120,8 @@ You can also call us directly at 555-0123 or email us at info@landscaper.com for
 🧹 **Cleanup Services**: Starting at $100/visit
 
 For a personalized quote, I can connect you with our sales specialist who will provide a detailed estimate based on your specific needs. Would you like me to arrange that for you?"""
-            
-        else:
-            content = """I'm here to help with any questions you have about our landscaping services. 
+
+_CS_DEFAULT = """I'm here to help with any questions you have about our landscaping services. 
 
 Could you please provide more details about what you're looking for? I can assist with:
 • Service information
@@ -170,15 +130,8 @@ Could you please provide more details about what you're looking for? I can assis
 • General questions
 
 How can I make your landscaping experience better today?"""
-        
-        return {"content": content, "type": "customer_service"}
-    
-    def _generate_landscaping_expert_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate landscaping expert response."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["plant", "garden", "design", "landscape"]):
-            content = """As a landscaping expert, I'd be delighted to help you with your garden and landscape design needs!
+
+_EXPERT_DESIGN = """As a landscaping expert, I'd be delighted to help you with your garden and landscape design needs!
 
 Here are some key considerations for your landscaping project:
 
@@ -189,9 +142,8 @@ Here are some key considerations for your landscaping project:
 🪨 **Hardscaping**: Integrate paths, patios, and retaining walls for structure
 
 What specific aspect of landscaping would you like to discuss? I can provide detailed advice on plant selection, design principles, or maintenance strategies."""
-            
-        elif any(word in query_lower for word in ["maintenance", "care", "fertilizer", "pruning"]):
-            content = """Proper maintenance is key to a healthy, beautiful landscape! Here's my expert advice:
+
+_EXPERT_MAINTENANCE = """Proper maintenance is key to a healthy, beautiful landscape! Here's my expert advice:
 
 🌿 **Lawn Care**:
 • Mow regularly (1/3 rule - never remove more than 1/3 of grass height)
@@ -212,9 +164,8 @@ What specific aspect of landscaping would you like to discuss? I can provide det
 • Test soil pH annually
 
 What specific maintenance question can I help you with?"""
-            
-        else:
-            content = """I'm here to share my landscaping expertise with you! Whether you're planning a new garden, need maintenance advice, or have questions about plant care, I'm ready to help.
+
+_EXPERT_DEFAULT = """I'm here to share my landscaping expertise with you! Whether you're planning a new garden, need maintenance advice, or have questions about plant care, I'm ready to help.
 
 Some areas I can assist with:
 • Landscape design and planning
@@ -225,15 +176,8 @@ Some areas I can assist with:
 • Hardscaping integration
 
 What landscaping challenge can I help you solve today?"""
-        
-        return {"content": content, "type": "expert_advice"}
-    
-    def _generate_sales_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate sales specialist response."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["quote", "estimate", "price", "cost"]):
-            content = """I'd be happy to provide you with a detailed quote for your landscaping project!
+
+_SALES_QUOTE = """I'd be happy to provide you with a detailed quote for your landscaping project!
 
 To give you the most accurate estimate, I'll need to understand your specific needs:
 
@@ -254,9 +198,8 @@ To give you the most accurate estimate, I'll need to understand your specific ne
 4. Plan your project timeline
 
 Would you like to schedule a consultation? I can arrange a visit from one of our experts to assess your property and provide a comprehensive proposal."""
-            
-        elif any(word in query_lower for word in ["package", "service", "plan"]):
-            content = """We offer comprehensive service packages designed to meet your landscaping needs and budget:
+
+_SALES_PACKAGES = """We offer comprehensive service packages designed to meet your landscaping needs and budget:
 
 🌿 **Basic Maintenance Package** ($50-100/month):
 • Weekly lawn mowing and edging
@@ -283,9 +226,8 @@ Would you like to schedule a consultation? I can arrange a visit from one of our
 • Dedicated account manager
 
 Which package interests you most? I can customize any package to fit your specific needs and budget."""
-            
-        else:
-            content = """I'm here to help you find the perfect landscaping solution for your property! 
+
+_SALES_DEFAULT = """I'm here to help you find the perfect landscaping solution for your property! 
 
 Let me understand your needs better:
 • What type of landscaping services are you most interested in?
@@ -293,15 +235,8 @@ Let me understand your needs better:
 • Are you looking for ongoing maintenance or a one-time project?
 
 I can provide detailed information about our services, pricing, and create a customized proposal that fits your needs. What would be most helpful for you right now?"""
-        
-        return {"content": content, "type": "sales"}
-    
-    def _generate_technical_support_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate technical support response."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["website", "app", "mobile", "browser"]):
-            content = """I'm here to help you with any technical issues you're experiencing with our website or mobile app!
+
+_TECH_WEB = """I'm here to help you with any technical issues you're experiencing with our website or mobile app!
 
 Common solutions:
 
@@ -324,9 +259,8 @@ If you're still experiencing problems, please:
 • Email us at info@landscaper.com with details
 
 What specific technical issue are you experiencing? I can provide step-by-step troubleshooting guidance."""
-            
-        else:
-            content = """I'm here to help you with any technical questions or issues you might have with our website or services!
+
+_TECH_DEFAULT = """I'm here to help you with any technical questions or issues you might have with our website or services!
 
 I can assist with:
 • Website navigation and features
@@ -337,15 +271,8 @@ I can assist with:
 • Performance and loading problems
 
 What technical issue can I help you resolve today?"""
-        
-        return {"content": content, "type": "technical_support"}
-    
-    def _generate_emergency_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate emergency response."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["emergency", "urgent", "storm", "damage", "dangerous"]):
-            content = """🚨 **EMERGENCY LANDSCAPING SERVICES** 🚨
+
+_EMERGENCY_URGENT = """🚨 **EMERGENCY LANDSCAPING SERVICES** 🚨
 
 I understand you have an urgent landscaping situation that needs immediate attention. Your safety is our top priority!
 
@@ -369,9 +296,8 @@ I understand you have an urgent landscaping situation that needs immediate atten
 Our emergency response team is standing by 24/7. Please call us immediately for urgent situations.
 
 **Is this a life-threatening emergency?** If so, please call 911 first, then contact us."""
-            
-        else:
-            content = """I'm here to help with any urgent landscaping needs you might have!
+
+_EMERGENCY_DEFAULT = """I'm here to help with any urgent landscaping needs you might have!
 
 While I'm primarily focused on emergency situations, I can also assist with:
 • Urgent service requests
@@ -382,14 +308,10 @@ While I'm primarily focused on emergency situations, I can also assist with:
 If you have a true emergency (storm damage, dangerous trees, etc.), please call our emergency hotline at 555-EMERGENCY.
 
 What urgent landscaping need can I help you with today?"""
-        
-        return {"content": content, "type": "emergency"}
-    
-    def _generate_generic_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate a generic response when no specific persona logic applies."""
-        content = f"""Hello! I'm {persona.get('name', 'your landscaping assistant')}, and I'm here to help you with your landscaping needs.
 
-{persona.get('description', '')}
+_GENERIC_RESPONSE = """Hello! I'm {name}, and I'm here to help you with your landscaping needs.
+
+{description}
 
 I can assist you with various aspects of landscaping services. Could you please provide more details about what you're looking for? The more specific you can be, the better I can help you.
 
@@ -401,44 +323,417 @@ Some common areas I can help with:
 • General inquiries
 
 How can I assist you today?"""
-        
-        return {"content": content, "type": "general"}
+
+
+def to_json(obj: Any) -> bytes:
+    """Serialize an agent response to UTF-8 JSON bytes with sorted keys."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class QueryResult:
+    """Outcome of LandscaperAIAgent.process_user_query."""
     
-    def _classify_query(self, query: str) -> str:
-        """Classify the type of query for analytics."""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["hello", "hi", "help"]):
-            return "greeting"
-        elif any(word in query_lower for word in ["price", "cost", "quote", "estimate"]):
-            return "pricing"
-        elif any(word in query_lower for word in ["appointment", "schedule", "book"]):
-            return "scheduling"
-        elif any(word in query_lower for word in ["plant", "garden", "design", "landscape"]):
-            return "technical"
-        elif any(word in query_lower for word in ["emergency", "urgent", "storm", "damage"]):
-            return "emergency"
-        elif any(word in query_lower for word in ["website", "app", "mobile", "technical"]):
-            return "technical_support"
-        else:
-            return "general"
+    success: bool
+    session_id: str
+    timestamp: str
+    response: Optional[str] = None
+    persona_id: Optional[str] = None
+    persona_name: Optional[str] = None
+    confidence: Optional[float] = None
+    query_type: Optional[str] = None
+    response_type: Optional[str] = None
+    error: Optional[str] = None
     
-    def _create_error_response(self, error_message: str) -> Dict[str, Any]:
-        """Create an error response."""
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the JSON-ready response dict served by the chat API."""
+        if not self.success:
+            return {
+                "success": False,
+                "error": self.error,
+                "metadata": {
+                    "session_id": self.session_id,
+                    "timestamp": self.timestamp,
+                    "error_type": "processing_error"
+                }
+            }
         return {
-            "success": False,
-            "error": error_message,
+            "success": True,
+            "response": self.response,
+            "persona": {
+                "id": self.persona_id,
+                "name": self.persona_name,
+                "confidence": self.confidence
+            },
             "metadata": {
                 "session_id": self.session_id,
-                "timestamp": datetime.now().isoformat(),
-                "error_type": "processing_error"
+                "timestamp": self.timestamp,
+                "query_type": self.query_type,
+                "response_type": self.response_type
             }
         }
     
+    def to_json(self) -> bytes:
+        """Serialize the response dict to JSON bytes."""
+        return to_json(self.to_dict())
+
+
+@lru_cache(maxsize=2048)
+def _classify_query_lower(query_lower: str) -> str:
+    """Classify a lowercased query; repeated queries are answered from the cache."""
+    keywords = _keywords_in(query_lower)
+    for group, query_type in _QUERY_TYPES:
+        if keywords & group:
+            return query_type
+    return "general"
+
+
+class LandscaperAIAgent:
+    """AI Agent that uses Context Manager and Persona Manager MCPs."""
+    
+    __slots__ = ("project_name", "_context_manager", "_persona_manager", "_client_lock",
+                 "current_persona", "conversation_context", "session_id",
+                 "_response_generators", "_context_writer", "_history",
+                 "_pending_entries", "_pending_lock", "_response_cache",
+                 "_persona_cache", "_persona_stats")
+    
+    def __init__(self, project_name: str = "landscaper"):
+        self.project_name = project_name
+        
+        # MCP clients are created on first use; see the properties below
+        self._context_manager = None
+        self._persona_manager = None
+        self._client_lock = threading.Lock()
+        
+        # Initialize agent state
+        self.current_persona = None
+        self.conversation_context = {}
+        # Hex nanosecond timestamp: unique per agent and cheap to produce
+        self.session_id = f"{time.time_ns():x}"
+        
+        # Context writes run on a single background thread so they overlap with
+        # persona selection while still being applied in submission order
+        self._context_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-context")
+        
+        # Conversation entries waiting for the writer; entries logged while a
+        # write is in flight are saved together in the next one
+        self._pending_entries = []
+        self._pending_lock = threading.Lock()
+        
+        # Local mirror of the conversation history, seeded from the context
+        # manager on the first history read
+        self._history = None
+        
+        # Persona id -> response generator; unknown personas get the generic one
+        self._response_generators = {
+            "customer_service_rep": self._generate_customer_service_response,
+            "landscaping_expert": self._generate_landscaping_expert_response,
+            "sales_specialist": self._generate_sales_response,
+            "technical_support": self._generate_technical_support_response,
+            "emergency_responder": self._generate_emergency_response,
+        }
+        
+        # Persona responses depend only on the persona id and the keywords in
+        # the query, so identical (persona, keywords) pairs reuse one response
+        self._response_cache = {}
+        
+        # (loaded_at, value) pairs for the persona catalog and its statistics;
+        # personas rarely change, so both are reused for _PERSONA_CACHE_TTL
+        self._persona_cache = None
+        self._persona_stats = None
+        
+        logger.info("LandscaperAIAgent initialized with session ID: %s", self.session_id)
+    
+    @property
+    def context_manager(self) -> ContextManagerClient:
+        """Context Manager client, created on first access."""
+        if self._context_manager is None:
+            with self._client_lock:
+                if self._context_manager is None:
+                    self._context_manager = ContextManagerClient(self.project_name)
+        return self._context_manager
+    
+    @property
+    def persona_manager(self) -> PersonaManagerClient:
+        """Persona Manager client, created on first access."""
+        if self._persona_manager is None:
+            with self._client_lock:
+                if self._persona_manager is None:
+                    self._persona_manager = PersonaManagerClient()
+        return self._persona_manager
+    
+    def close(self) -> None:
+        """Write any queued context and persona updates and stop the background writer."""
+        self._context_writer.shutdown(wait=True)
+        if self._context_manager is not None:
+            self._context_manager.close()
+        if self._persona_manager is not None:
+            self._persona_manager.flush()
+    
+    def process_user_query(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> QueryResult:
+        """
+        Process a user query using the appropriate persona and context.
+        
+        Args:
+            query: The user's question or request
+            user_context: Additional context about the user or situation
+            
+        Returns:
+            QueryResult with the response and metadata; use to_dict() for JSON
+        """
+        # One timestamp covers every record made for this query
+        now_iso = datetime.now().isoformat()
+        query_lower = query.lower()
+        
+        try:
+            # Add query to conversation history
+            self._log_conversation(
+                role="user",
+                content=query,
+                metadata={
+                    "session_id": self.session_id,
+                    "user_context": user_context or {},
+                    "timestamp": now_iso
+                }
+            )
+            
+            # Route obvious queries directly; score every persona only for the rest
+            selected_persona, confidence = self._route_persona(query_lower, user_context)
+            if selected_persona is None:
+                selected_persona, confidence = self.persona_manager.select_best_persona(
+                    task=query,
+                    context=user_context,
+                    personas=self._personas()
+                )
+            
+            if not selected_persona:
+                return self._create_error_response("No suitable persona found for this query", now_iso)
+            
+            # Update current persona
+            self.current_persona = selected_persona
+            
+            # Generate response based on persona and context
+            response = self._generate_response(query, selected_persona, user_context, query_lower)
+            
+            # Add response to conversation history without waiting for the write
+            self._log_conversation(
+                role="assistant",
+                content=response["content"],
+                metadata={
+                    "session_id": self.session_id,
+                    "persona_used": selected_persona["id"],
+                    "confidence": confidence,
+                    "timestamp": now_iso
+                }
+            )
+            
+            return QueryResult(
+                success=True,
+                session_id=self.session_id,
+                timestamp=now_iso,
+                response=response["content"],
+                persona_id=selected_persona["id"],
+                persona_name=selected_persona["name"],
+                confidence=confidence,
+                query_type=self._classify_query(query, query_lower),
+                response_type=response["type"]
+            )
+            
+        except Exception as e:
+            logger.error("Error processing user query: %s", e)
+            return self._create_error_response(f"An error occurred while processing your request: {str(e)}", now_iso)
+    
+    def _personas(self) -> Dict[str, Dict[str, Any]]:
+        """Persona id -> persona, reloaded once the cached copy is older than the TTL."""
+        cached = self._persona_cache
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < _PERSONA_CACHE_TTL:
+            return cached[1]
+        
+        personas = {persona["id"]: persona for persona in self.persona_manager.list_personas()}
+        # An empty catalog usually means a failed read; try again next time
+        if personas:
+            self._persona_cache = (now, personas)
+        return personas
+    
+    def _persona_statistics(self) -> Dict[str, Any]:
+        """Persona usage statistics, recomputed once the cached copy is older than the TTL."""
+        cached = self._persona_stats
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < _PERSONA_CACHE_TTL:
+            return cached[1]
+        
+        stats = self.persona_manager.get_persona_statistics()
+        self._persona_stats = (now, stats)
+        return stats
+    
+    def _route_persona(self, query_lower: str,
+                       user_context: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Pick a persona from hard-signal words, or (None, 0.0) if none apply.
+        
+        The confidence is the routed persona's own score for the query, as
+        select_best_persona would report it, rather than a fixed value.
+        """
+        words = _words_in(query_lower)
+        for group, persona_id in _PERSONA_ROUTES:
+            if words & group:
+                persona = self._personas().get(persona_id)
+                if persona:
+                    # select_best_persona records usage; routed queries count too
+                    self._context_writer.submit(self.persona_manager.record_usage, persona_id)
+                    return persona, self.persona_manager.score_persona(persona, query_lower, user_context)
+        return None, 0.0
+    
+    def _generate_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                           query_lower: Optional[str] = None) -> Dict[str, Any]:
+        """Generate a response based on the selected persona and context."""
+        keywords = _keywords_in(query_lower or query.lower())
+        
+        # The generic response is built from the persona's own fields; it is
+        # not cached so edits to a persona show up immediately
+        generator = self._response_generators.get(persona["id"])
+        if generator is None:
+            return self._generate_generic_response(query, persona, user_context, keywords)
+        
+        # Generate persona-specific responses
+        key = (persona["id"], keywords)
+        response = self._response_cache.get(key)
+        if response is None:
+            response = generator(query, persona, user_context, keywords)
+            if len(self._response_cache) >= _RESPONSE_CACHE_SIZE:
+                self._response_cache.clear()
+            self._response_cache[key] = response
+        return response
+    
+    def _generate_customer_service_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                            keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate customer service response."""
+        if keywords is None:
+            keywords = _keywords_in(query.lower())
+        
+        if keywords & _SERVICE_GREETING_KW:
+            content = _CS_GREETING
+        elif keywords & _SCHEDULING_KW:
+            content = _CS_APPOINTMENT
+        elif keywords & _PRICING_KW:
+            content = _CS_PRICING
+        else:
+            content = _CS_DEFAULT
+        
+        return {"content": content, "type": "customer_service"}
+    
+    def _generate_landscaping_expert_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                              keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate landscaping expert response."""
+        if keywords is None:
+            keywords = _keywords_in(query.lower())
+        
+        if keywords & _DESIGN_KW:
+            content = _EXPERT_DESIGN
+        elif keywords & _MAINTENANCE_KW:
+            content = _EXPERT_MAINTENANCE
+        else:
+            content = _EXPERT_DEFAULT
+        
+        return {"content": content, "type": "expert_advice"}
+    
+    def _generate_sales_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                 keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate sales specialist response."""
+        if keywords is None:
+            keywords = _keywords_in(query.lower())
+        
+        if keywords & _PRICING_KW:
+            content = _SALES_QUOTE
+        elif keywords & _PACKAGE_KW:
+            content = _SALES_PACKAGES
+        else:
+            content = _SALES_DEFAULT
+        
+        return {"content": content, "type": "sales"}
+    
+    def _generate_technical_support_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                             keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate technical support response."""
+        if keywords is None:
+            keywords = _keywords_in(query.lower())
+        
+        if keywords & _WEB_SUPPORT_KW:
+            content = _TECH_WEB
+        else:
+            content = _TECH_DEFAULT
+        
+        return {"content": content, "type": "technical_support"}
+    
+    def _generate_emergency_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                     keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate emergency response."""
+        if keywords is None:
+            keywords = _keywords_in(query.lower())
+        
+        if keywords & _EMERGENCY_RESPONSE_KW:
+            content = _EMERGENCY_URGENT
+        else:
+            content = _EMERGENCY_DEFAULT
+        
+        return {"content": content, "type": "emergency"}
+    
+    def _generate_generic_response(self, query: str, persona: Dict[str, Any], user_context: Optional[Dict[str, Any]],
+                                   keywords: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Generate a generic response when no specific persona logic applies."""
+        content = _GENERIC_RESPONSE.format(
+            name=persona.get('name', 'your landscaping assistant'),
+            description=persona.get('description', '')
+        )
+        
+        return {"content": content, "type": "general"}
+    
+    def _classify_query(self, query: str, query_lower: Optional[str] = None) -> str:
+        """Classify the type of query for analytics."""
+        return _classify_query_lower(query_lower or query.lower())
+    
+    def _create_error_response(self, error_message: str, now_iso: Optional[str] = None) -> QueryResult:
+        """Create an error response, stamped with now_iso when the caller has one."""
+        return QueryResult(
+            success=False,
+            session_id=self.session_id,
+            timestamp=now_iso or datetime.now().isoformat(),
+            error=error_message
+        )
+    
+    def _log_conversation(self, role: str, content: str, metadata: Dict[str, Any]) -> None:
+        """Queue a conversation entry for the context manager and mirror it locally."""
+        with self._pending_lock:
+            self._pending_entries.append({"role": role, "content": content, "metadata": metadata})
+            start_batch = len(self._pending_entries) == 1
+        if start_batch:
+            self._context_writer.submit(self._write_pending_entries)
+        if self._history is not None:
+            self._history.append({
+                "role": role,
+                "content": content,
+                "timestamp": metadata["timestamp"],
+                "metadata": metadata
+            })
+    
+    def _write_pending_entries(self) -> None:
+        """Save every queued conversation entry in one context write."""
+        with self._pending_lock:
+            entries, self._pending_entries = self._pending_entries, []
+        self.context_manager.add_conversation_entries(entries)
+    
+    def flush(self) -> None:
+        """Wait for queued context writes to be applied."""
+        self._context_writer.submit(lambda: None).result()
+    
     def get_agent_status(self) -> Dict[str, Any]:
         """Get current agent status and statistics."""
+        self.flush()
         context_summary = self.context_manager.get_context_summary()
-        persona_stats = self.persona_manager.get_persona_statistics()
+        persona_stats = self._persona_statistics()
         
         return {
             "session_id": self.session_id,
@@ -451,20 +746,22 @@ How can I assist you today?"""
     
     def update_project_goal(self, goal: str) -> bool:
         """Update the project goal in context manager."""
-        return self.context_manager.set_current_goal(goal)
+        return self._context_writer.submit(self.context_manager.set_current_goal, goal).result()
     
     def add_completed_feature(self, feature: str) -> bool:
         """Add a completed feature to the context manager."""
-        return self.context_manager.add_completed_feature(feature)
+        return self._context_writer.submit(self.context_manager.add_completed_feature, feature).result()
     
     def add_current_issue(self, issue: str, location: str = "", root_cause: str = "") -> bool:
         """Add a current issue to the context manager."""
-        return self.context_manager.add_current_issue(issue, location, root_cause)
+        return self._context_writer.submit(self.context_manager.add_current_issue, issue, location, root_cause).result()
     
     def get_conversation_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent conversation history."""
-        context = self.context_manager.get_full_context()
-        history = context.get('conversation_history', [])
-        return history[-limit:] if history else []
+        if self._history is None:
+            self.flush()
+            context = self.context_manager.get_full_context()
+            self._history = deque(context.get('conversation_history', []), maxlen=_HISTORY_LIMIT)
+        return list(islice(self._history, max(0, len(self._history) - limit), None))
 
 
@@ -5,121 +5,473 @@ This client integrates with the context_manager MCP to maintain project context,
 track goals, and manage conversation state for the landscaper application.
 """
 
+import atexit
+import copy
+import io
 import json
+import mmap
 import os
-import requests
-from typing import Dict, List, Optional, Any
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from functools import lru_cache, wraps
 from pathlib import Path
 import logging
 
+from ._http import DEFAULT_TIMEOUT, session
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib json module reads and writes the same documents
+    orjson = None
+    _loads = json.loads
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; only compress=True needs it
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
 
+NL = "\n"
+
+# Conversation entries kept in the context
+_HISTORY_LIMIT = 50
+
+# Logged events after which the context file is rewritten and the log emptied
+_COMPACT_EVERY = 100
+
+# Seconds the background writer waits after a mutation before writing, so a
+# burst of mutations produces one write
+_STATUS_DELAY = 0.5
+
+# Seconds to wait at exit for the background writer to finish
+_WRITER_JOIN_TIMEOUT = 5.0
+
+# (client, method name) pairs for the background writer; None stops it
+_write_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _writer_loop():
+    """Run queued client writes, coalescing repeats that arrive within _STATUS_DELAY."""
+    stop = False
+    while not stop:
+        pending = {}
+        item = _write_queue.get()
+        deadline = time.monotonic() + _STATUS_DELAY
+        while True:
+            if item is None:
+                stop = True
+                deadline = 0
+            else:
+                pending.setdefault(item, None)
+            remaining = deadline - time.monotonic()
+            try:
+                item = _write_queue.get(timeout=remaining) if remaining > 0 else _write_queue.get_nowait()
+            except queue.Empty:
+                break
+        for client, method in pending:
+            try:
+                getattr(client, method)()
+            except Exception as e:
+                logger.error("Background %s of %s context failed: %s", method, client.project_name, e)
+
+
+def _submit_write(client, method: str):
+    """Queue client.method() for the background writer, starting it if needed."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="context-writer", daemon=True)
+                _writer.start()
+    _write_queue.put((client, method))
+
+
+@atexit.register
+def _stop_writer():
+    if _writer is not None:
+        _write_queue.put(None)
+        _writer.join(_WRITER_JOIN_TIMEOUT)
+
+
+def _dumps(context: Dict[str, Any]) -> bytes:
+    """
+    Serialize a context document to compact JSON bytes.
+    
+    The context file is for the client to read back; the status file is the
+    human-readable view, so nothing is indented.
+    """
+    # default=list writes the conversation history deque as a JSON array
+    if orjson is not None:
+        return orjson.dumps(context, default=list, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(context, default=list, separators=(",", ":")).encode()
+
+
+def _read_json_file(path: str, decompressor=None) -> Tuple[Any, Tuple[int, int]]:
+    """
+    Parse a JSON file, returning the document and the file's (mtime_ns, size).
+    
+    With orjson the file is memory-mapped and parsed in place, so the page cache
+    backs the parse without first copying the file into a bytes object. A
+    zstandard decompressor, if given, is applied to the file contents first.
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        stat = (st.st_mtime_ns, st.st_size)
+        if decompressor is not None:
+            return _loads(decompressor.decompress(f.read())), stat
+        if orjson is None or st.st_size == 0:
+            return _loads(f.read()), stat
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view), stat
+
+
+# fdatasync skips the metadata flush where the platform provides it
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def _write_file(path: str, data: bytes, durable: bool = False):
+    """
+    Atomically replace a file's contents with data.
+    
+    The data goes to a temporary file next to path, which is then renamed over
+    it, so readers and crashes never see a half-written file. The temporary
+    file is opened unbuffered and the payload handed to the kernel in one
+    write. With durable set the data is synced to disk before the rename.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        try:
+            f = open(tmp, 'wb', buffering=0)
+        except FileNotFoundError:
+            # First write for the project; create the contexts directory
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(tmp, 'wb', buffering=0)
+        with f:
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
+            if durable:
+                _fdatasync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class _ContextIndex:
+    """Lookup tables over a context's lists, kept in step by the _apply_* functions."""
+    
+    __slots__ = ("features", "steps", "issues_by_problem", "anchors_by_key")
+    
+    def __init__(self, context: Dict[str, Any]):
+        self.features = set(context.get('completed_features', []))
+        self.steps = set(context.get('next_steps', []))
+        # First issue per problem, the one mark_issue_resolved updates
+        self.issues_by_problem = {}
+        for issue in context.get('current_issues', []):
+            self.issues_by_problem.setdefault(issue.get('problem'), issue)
+        self.anchors_by_key = {anchor.get('key'): anchor for anchor in context.get('context_anchors', [])}
+
+
+# Context mutations, applied both when a mutator runs and when the event log is
+# replayed; everything they need, timestamps included, is in their arguments
+
+def _apply_set_current_goal(context: Dict[str, Any], index: _ContextIndex, goal: str, timestamp: str):
+    context['current_goal'] = goal
+    context['last_updated'] = timestamp
+
+
+def _apply_add_completed_feature(context: Dict[str, Any], index: _ContextIndex, feature: str, timestamp: str):
+    context.setdefault('completed_features', []).append(feature)
+    index.features.add(feature)
+    context['last_updated'] = timestamp
+
+
+def _apply_add_current_issue(context: Dict[str, Any], index: _ContextIndex, issue: Dict[str, Any], timestamp: str):
+    context.setdefault('current_issues', []).append(issue)
+    index.issues_by_problem.setdefault(issue['problem'], issue)
+    context['last_updated'] = timestamp
+
+
+def _apply_add_next_step(context: Dict[str, Any], index: _ContextIndex, step: str, timestamp: str):
+    context.setdefault('next_steps', []).append(step)
+    index.steps.add(step)
+    context['last_updated'] = timestamp
+
+
+def _apply_add_context_anchor(context: Dict[str, Any], index: _ContextIndex, anchor: Dict[str, Any],
+                              timestamp: str):
+    anchors = context.setdefault('context_anchors', [])
+    key = anchor['key']
+    if key in index.anchors_by_key:
+        # Replace any existing anchor with the same key
+        anchors[:] = [a for a in anchors if a.get('key') != key]
+    anchors.append(anchor)
+    index.anchors_by_key[key] = anchor
+    context['last_updated'] = timestamp
+
+
+def _apply_update_current_state(context: Dict[str, Any], index: _ContextIndex, updates: Dict[str, Any],
+                                timestamp: str):
+    context.setdefault('current_state', {}).update(updates)
+    context['last_updated'] = timestamp
+
+
+def _changed_state(current_state: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the entries of updates that would change current_state.
+    
+    A dict or list that is the very object already stored is kept, since the
+    caller may have changed it in place.
+    """
+    missing = object()
+    changed = {}
+    for key, value in updates.items():
+        old = current_state.get(key, missing)
+        if old != value or (old is value and isinstance(value, (dict, list))):
+            changed[key] = value
+    return changed
+
+
+def _apply_add_conversation_entries(context: Dict[str, Any], index: _ContextIndex, entries: List[Dict[str, Any]],
+                                    timestamp: str):
+    # Keep only the last entries to prevent the file from growing too large; a
+    # bounded deque drops the oldest ones as new ones arrive
+    history = context.get('conversation_history')
+    if not isinstance(history, deque):
+        history = context['conversation_history'] = deque(history or (), maxlen=_HISTORY_LIMIT)
+    history.extend(entries)
+    context['last_updated'] = timestamp
+
+
+def _apply_clear_issues(context: Dict[str, Any], index: _ContextIndex, timestamp: str):
+    context['current_issues'] = []
+    index.issues_by_problem.clear()
+    context['last_updated'] = timestamp
+
+
+def _apply_mark_issue_resolved(context: Dict[str, Any], index: _ContextIndex, problem: str, timestamp: str):
+    issue = index.issues_by_problem.get(problem)
+    if issue is not None:
+        issue['status'] = 'resolved'
+        issue['resolved_at'] = timestamp
+    context['last_updated'] = timestamp
+
+
+_APPLY = {
+    "set_current_goal": _apply_set_current_goal,
+    "add_completed_feature": _apply_add_completed_feature,
+    "add_current_issue": _apply_add_current_issue,
+    "add_next_step": _apply_add_next_step,
+    "add_context_anchor": _apply_add_context_anchor,
+    "update_current_state": _apply_update_current_state,
+    "add_conversation_entries": _apply_add_conversation_entries,
+    "clear_issues": _apply_clear_issues,
+    "mark_issue_resolved": _apply_mark_issue_resolved,
+}
+
+
+# Context for a project without a context file; _default_context() fills in
+# project_name and the None timestamps
+_DEFAULT_CONTEXT = {
+    "current_goal": "Build a mobile-first landscaping web application",
+    "completed_features": [
+        "Basic Flask web application structure",
+        "Mobile-first CSS framework",
+        "Responsive design with touch-friendly interface",
+        "PWA capabilities with service worker",
+        "Contact integration (phone, email, maps)",
+        "Service catalog and pricing information"
+    ],
+    "current_issues": [],
+    "next_steps": [
+        "Integrate MCP services (Context Manager and Persona Manager)",
+        "Add AI agent for customer interactions",
+        "Implement booking system",
+        "Add image gallery for completed projects",
+        "Set up database for customer data"
+    ],
+    "current_state": {
+        "development_phase": "MCP Integration",
+        "last_major_update": None,
+        "active_features": ["web_ui", "mobile_optimization", "pwa"]
+    },
+    "key_files": [
+        "app.py",
+        "static/css/mobile.css",
+        "static/js/app.js",
+        "templates/base.html",
+        "templates/index.html"
+    ],
+    "context_anchors": [
+        {
+            "key": "PROJECT_TYPE",
+            "value": "Mobile-first web application for landscaping services",
+            "description": "Primary project type and target platform",
+            "priority": 1
+        },
+        {
+            "key": "TECH_STACK",
+            "value": "Flask, HTML5, CSS3, JavaScript, PWA",
+            "description": "Main technologies used in the project",
+            "priority": 1
+        },
+        {
+            "key": "TARGET_AUDIENCE",
+            "value": "Mobile users seeking landscaping services",
+            "description": "Primary user demographic",
+            "priority": 2
+        }
+    ],
+    "conversation_history": [],
+    "last_updated": None
+}
+
+
+def _default_context(project_name: str) -> Dict[str, Any]:
+    """Return a fresh default context for a project."""
+    timestamp = datetime.now().isoformat()
+    context = {"project_name": project_name, **copy.deepcopy(_DEFAULT_CONTEXT)}
+    context["current_state"]["last_major_update"] = timestamp
+    context["last_updated"] = timestamp
+    return context
+
+
+@lru_cache(maxsize=None)
+def _probe_mcp_server(server_url: str) -> bool:
+    """
+    Check whether an MCP context server is reachable.
+    
+    The result is shared by every client in the process, so the docker
+    subprocess and the health request run once per server URL rather than
+    once per client.
+    """
+    # Check for Docker MCP server first
+    try:
+        import subprocess
+        result = subprocess.run(['docker', 'ps', '--filter', 'name=mcp-context', '--format', '{{.Names}}'], 
+                              capture_output=True, text=True, timeout=2)
+        if result.returncode == 0 and result.stdout.strip():
+            logger.info("Docker MCP context server detected")
+            return True
+    except:
+        pass
+    
+    # Check for HTTP server
+    try:
+        response = session().get(f"{server_url}/health", timeout=2)
+        if response.status_code == 200:
+            logger.info("HTTP MCP server detected")
+            return True
+    except:
+        pass
+        
+    logger.warning("No MCP server available, falling back to file-based context management")
+    return False
+
+
+def _locked(method):
+    """Run a client method while holding the client's context lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class ContextManagerClient:
     """Client for interacting with the Context Manager MCP."""
     
-    def __init__(self, project_name: str = "landscaper", project_root: Optional[str] = None):
+    __slots__ = ("project_name", "project_root", "context_file", "status_file", "log_file",
+                 "_context_path", "_status_path", "_log_path",
+                 "mcp_server_url", "use_mcp_server", "_context", "_context_stat", "_lock",
+                 "_log_offset", "_log_stale", "_log_events", "_status_dirty",
+                 "_summary_cache", "_index", "_zstd", "_txn_events")
+    
+    def __new__(cls, project_name: str = "landscaper", project_root: Optional[str] = None, backend: str = "json",
+                compress: bool = False):
+        # backend="sqlite" returns the SQLite-backed subclass instead
+        if backend == "sqlite" and cls is ContextManagerClient:
+            from .context_sqlite import SQLiteContextBackend
+            cls = SQLiteContextBackend
+        elif backend not in ("json", "sqlite"):
+            raise ValueError(f"Unknown context backend: {backend!r}")
+        return super().__new__(cls)
+    
+    def __init__(self, project_name: str = "landscaper", project_root: Optional[str] = None, backend: str = "json",
+                 compress: bool = False):
         self.project_name = project_name
         self.project_root = Path(project_root) if project_root else Path.cwd()
-        self.context_file = self.project_root / "contexts" / f"{self.project_name}_context_cache.json"
+        
+        # compress=True keeps a zstd-compressed context file, with its own log,
+        # alongside the plain one
+        if compress:
+            if zstandard is None:
+                raise ImportError("compress=True requires the zstandard package")
+            self._zstd = (zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor())
+            context_name, log_name = "_context_cache.json.zst", "_context.zst.log"
+        else:
+            self._zstd = None
+            context_name, log_name = "_context_cache.json", "_context.log"
+        self.context_file = self.project_root / "contexts" / f"{self.project_name}{context_name}"
         self.status_file = self.project_root / "contexts" / f"{self.project_name}_CONTEXT_STATUS.md"
+        self.log_file = self.project_root / "contexts" / f"{self.project_name}{log_name}"
+        # Plain string paths for the file calls on every read and write
+        self._context_path = os.fspath(self.context_file)
+        self._status_path = os.fspath(self.status_file)
+        self._log_path = os.fspath(self.log_file)
         
         # MCP server configuration
         self.mcp_server_url = "http://localhost:8000"
         self.use_mcp_server = self._check_mcp_server_available()
         
-        # Ensure contexts directory exists
-        self.context_file.parent.mkdir(exist_ok=True)
+        # Parsed context kept between calls, with the (mtime, size) of the file
+        # it was read from; the lock serializes mutations of the shared dict
+        self._context = None
+        self._context_stat = None
+        self._lock = threading.RLock()
+        # Lookup tables for the cached context; see _ContextIndex
+        self._index = None
         
-        # Initialize context if it doesn't exist
-        if not self.context_file.exists():
-            self._initialize_context()
+        # File-based mutations are appended to log_file as one JSON event per
+        # line and folded into context_file every _COMPACT_EVERY events. The
+        # log starts with a header naming the context file stat it applies to.
+        self._log_offset = 0
+        self._log_stale = False
+        self._log_events = 0
+        
+        # The status file is rewritten by flush(), which the background writer
+        # runs shortly after a mutation, and on close() and at exit;
+        # _status_dirty holds the timestamp of the latest unwritten mutation
+        self._status_dirty = None
+        
+        # (context file stat, log offset) -> summary for the last file-based
+        # get_context_summary(); both change whenever the context does
+        self._summary_cache = None
+        
+        # Events recorded inside transaction(), persisted when it ends; None
+        # outside a transaction
+        self._txn_events = None
+        
+        # Nothing is read or written here: a missing context file is created
+        # from the defaults by the first mutation
     
     def _check_mcp_server_available(self) -> bool:
         """Check if MCP server is available."""
-        # Check for Docker MCP server first
-        try:
-            import subprocess
-            result = subprocess.run(['docker', 'ps', '--filter', 'name=mcp-context', '--format', '{{.Names}}'], 
-                                  capture_output=True, text=True, timeout=2)
-            if result.returncode == 0 and result.stdout.strip():
-                logger.info("Docker MCP context server detected")
-                return True
-        except:
-            pass
-        
-        # Check for HTTP server
-        try:
-            response = requests.get(f"{self.mcp_server_url}/health", timeout=2)
-            if response.status_code == 200:
-                logger.info("HTTP MCP server detected")
-                return True
-        except:
-            pass
-            
-        logger.warning("No MCP server available, falling back to file-based context management")
-        return False
-    
-    def _initialize_context(self):
-        """Initialize the context file with default values."""
-        initial_context = {
-            "project_name": self.project_name,
-            "current_goal": "Build a mobile-first landscaping web application",
-            "completed_features": [
-                "Basic Flask web application structure",
-                "Mobile-first CSS framework",
-                "Responsive design with touch-friendly interface",
-                "PWA capabilities with service worker",
-                "Contact integration (phone, email, maps)",
-                "Service catalog and pricing information"
-            ],
-            "current_issues": [],
-            "next_steps": [
-                "Integrate MCP services (Context Manager and Persona Manager)",
-                "Add AI agent for customer interactions",
-                "Implement booking system",
-                "Add image gallery for completed projects",
-                "Set up database for customer data"
-            ],
-            "current_state": {
-                "development_phase": "MCP Integration",
-                "last_major_update": datetime.now().isoformat(),
-                "active_features": ["web_ui", "mobile_optimization", "pwa"]
-            },
-            "key_files": [
-                "app.py",
-                "static/css/mobile.css",
-                "static/js/app.js",
-                "templates/base.html",
-                "templates/index.html"
-            ],
-            "context_anchors": [
-                {
-                    "key": "PROJECT_TYPE",
-                    "value": "Mobile-first web application for landscaping services",
-                    "description": "Primary project type and target platform",
-                    "priority": 1
-                },
-                {
-                    "key": "TECH_STACK",
-                    "value": "Flask, HTML5, CSS3, JavaScript, PWA",
-                    "description": "Main technologies used in the project",
-                    "priority": 1
-                },
-                {
-                    "key": "TARGET_AUDIENCE",
-                    "value": "Mobile users seeking landscaping services",
-                    "description": "Primary user demographic",
-                    "priority": 2
-                }
-            ],
-            "conversation_history": [],
-            "last_updated": datetime.now().isoformat()
-        }
-        
-        self._save_context(initial_context)
-        self._create_status_file(initial_context)
+        return _probe_mcp_server(self.mcp_server_url)
     
     def _save_context(self, context: Dict[str, Any]):
         """Save context to JSON file or MCP server."""
@@ -127,23 +479,25 @@ class ContextManagerClient:
             if self.use_mcp_server:
                 # Try to save via MCP server first
                 try:
-                    response = requests.post(
+                    # _dumps writes the conversation history deque as a list,
+                    # which requests' json= encoder cannot
+                    response = session().post(
                         f"{self.mcp_server_url}/api/context/save",
-                        json={"project_name": self.project_name, "context": context},
-                        timeout=5
+                        data=_dumps({"project_name": self.project_name, "context": context}),
+                        headers={"Content-Type": "application/json"},
+                        timeout=DEFAULT_TIMEOUT
                     )
                     if response.status_code == 200:
-                        logger.info(f"Context saved via MCP server for {self.project_name}")
+                        logger.info("Context saved via MCP server for %s", self.project_name)
                         return
                 except Exception as e:
-                    logger.warning(f"MCP server save failed, falling back to file: {e}")
+                    logger.warning("MCP server save failed, falling back to file: %s", e)
             
             # Fallback to file-based storage
-            with open(self.context_file, 'w') as f:
-                json.dump(context, f, indent=2)
-            logger.info(f"Context saved to {self.context_file}")
+            self._write_snapshot(context)
+            logger.info("Context saved to %s", self.context_file)
         except Exception as e:
-            logger.error(f"Failed to save context: {e}")
+            logger.error("Failed to save context: %s", e)
     
     def _load_context(self) -> Dict[str, Any]:
         """Load context from JSON file or MCP server."""
@@ -151,205 +505,451 @@ class ContextManagerClient:
             if self.use_mcp_server:
                 # Try to load via MCP server first
                 try:
-                    response = requests.get(
+                    response = session().get(
                         f"{self.mcp_server_url}/api/context/load",
                         params={"project_name": self.project_name},
-                        timeout=5
+                        timeout=DEFAULT_TIMEOUT
                     )
                     if response.status_code == 200:
-                        data = response.json()
+                        data = _loads(response.content)
                         if data.get("success"):
-                            logger.info(f"Context loaded via MCP server for {self.project_name}")
+                            logger.info("Context loaded via MCP server for %s", self.project_name)
                             return data.get("context", {})
                 except Exception as e:
-                    logger.warning(f"MCP server load failed, falling back to file: {e}")
+                    logger.warning("MCP server load failed, falling back to file: %s", e)
             
             # Fallback to file-based storage
-            with open(self.context_file, 'r') as f:
-                return json.load(f)
+            return self._load_file_context()
         except Exception as e:
-            logger.error(f"Failed to load context: {e}")
+            logger.error("Failed to load context: %s", e)
             return {}
     
-    def _create_status_file(self, context: Dict[str, Any]):
-        """Create a human-readable status file."""
-        status_content = f"""# {self.project_name.upper()} - CONTEXT STATUS
-
-## Current Goal
-{context.get('current_goal', 'No goal set')}
-
-## Completed Features
-{chr(10).join(f"- {feature}" for feature in context.get('completed_features', []))}
-
-## Current Issues
-{chr(10).join(f"- {issue}" for issue in context.get('current_issues', [])) if context.get('current_issues') else "No current issues"}
-
-## Next Steps
-{chr(10).join(f"- {step}" for step in context.get('next_steps', []))}
-
-## Current State
-- Development Phase: {context.get('current_state', {}).get('development_phase', 'Unknown')}
-- Last Updated: {context.get('last_updated', 'Unknown')}
-
-## Key Files
-{chr(10).join(f"- {file}" for file in context.get('key_files', []))}
-
-## Context Anchors
-{chr(10).join(f"- **{anchor['key']}**: {anchor['value']} - {anchor['description']}" for anchor in context.get('context_anchors', []))}
-
----
-*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
+    def _load_file_context(self) -> Dict[str, Any]:
+        """Read the context file and replay the event log over it."""
+        try:
+            context, stat = _read_json_file(self._context_path, self._zstd and self._zstd[1])
+        except FileNotFoundError:
+            # New project; the defaults are written by the first mutation
+            context, stat = self._initial_context(), None
+        
+        self._context_stat = stat
+        self._log_offset = 0
+        self._log_stale = False
+        self._log_events = 0
+        self._index = _ContextIndex(context)
+        self._replay_log(context, self._index)
+        return context
+    
+    def _initial_context(self) -> Dict[str, Any]:
+        """Context for a client whose context file does not exist yet."""
+        if self._zstd is not None:
+            # A compressed context starts as a copy of the plain one, if any;
+            # the plain files are left untouched
+            return ContextManagerClient(self.project_name, self.project_root).get_full_context()
+        return _default_context(self.project_name)
+    
+    def _replay_log(self, context: Dict[str, Any], index: _ContextIndex):
+        """Apply logged events past _log_offset to context."""
+        try:
+            f = open(self._log_path, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # An event still being written; pick it up next time
+                    break
+                try:
+                    event = _loads(line)
+                except ValueError:
+                    # Torn by a crash mid-write and then appended to
+                    logger.warning("Skipping unreadable event in %s", self.log_file)
+                    self._log_offset += len(line)
+                    continue
+                if "base" in event:
+                    if event["base"] != (list(self._context_stat) if self._context_stat else None):
+                        # Left over from before the last compaction; its events
+                        # are already in the context file
+                        self._log_stale = True
+                        self._log_offset = f.seek(0, os.SEEK_END)
+                        return
+                else:
+                    _APPLY[event["op"]](context, index, **event["payload"])
+                    self._log_events += 1
+                self._log_offset += len(line)
+    
+    def _append_events(self, events: List[Tuple[str, Dict[str, Any]]]):
+        """Append mutations to the event log in one write, compacting when it grows long."""
+        data = b"".join(_dumps({"op": op, "payload": payload}) + b"\n" for op, payload in events)
+        start = self._log_stale or self._log_offset == 0
+        if start:
+            header = {"base": list(self._context_stat) if self._context_stat else None}
+            data = _dumps(header) + b"\n" + data
+        
+        with open(self._log_path, 'wb' if start else 'ab') as f:
+            f.write(data)
+            end = f.tell()
+        
+        logged = self._log_events
+        if end == (0 if start else self._log_offset) + len(data):
+            self._log_offset = end
+            self._log_stale = False
+            self._log_events += len(events)
+        else:
+            # Another writer appended in between; reload before the next use
+            self._context = None
+        
+        if logged < _COMPACT_EVERY <= self._log_events:
+            # The durable rewrite happens on the background writer
+            _submit_write(self, "_compact")
+    
+    @_locked
+    def _compact(self):
+        """Fold a long event log into the context file."""
+        if self._log_events < _COMPACT_EVERY or self.use_mcp_server:
+            return
+        # Catch up with other writers first so their events are not dropped
+        context = self._get_context()
+        if self._log_events >= _COMPACT_EVERY:
+            self._write_snapshot(context)
+    
+    def _write_snapshot(self, context: Dict[str, Any]):
+        """Write the whole context file and empty the event log it now includes."""
+        data = _dumps(context)
+        if self._zstd is not None:
+            data = self._zstd[0].compress(data)
+        _write_file(self._context_path, data, durable=True)
+        try:
+            os.truncate(self._log_path, 0)
+        except FileNotFoundError:
+            pass
+        self._context_stat = self._file_stat()
+        self._log_offset = 0
+        self._log_stale = False
+        self._log_events = 0
+    
+    def _file_stat(self) -> Optional[tuple]:
+        """Return (mtime_ns, size) of the context file, or None if it is missing."""
+        try:
+            st = os.stat(self._context_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _log_size(self) -> int:
+        """Return the size of the event log, or 0 if it is missing."""
+        try:
+            return os.stat(self._log_path).st_size
+        except OSError:
+            return 0
+    
+    def _get_context(self) -> Dict[str, Any]:
+        """
+        Return the current context for reading or in-place mutation.
+        
+        File-based contexts are parsed once and reused; events other writers
+        append to the log are replayed on top, and a changed context file means
+        a full reload. The MCP server stays the source of truth and is asked
+        every time. Inside a transaction the context in use is kept until the
+        transaction ends.
+        """
+        if self._txn_events is not None and self._context is not None:
+            return self._context
+        
+        if self.use_mcp_server:
+            context = self._load_context()
+            if self._txn_events is not None:
+                self._context = context
+                self._index = _ContextIndex(context)
+            return context
+        
+        log_size = self._log_size()
+        if (self._context is None or self._file_stat() != self._context_stat
+                or log_size < self._log_offset or (self._log_stale and log_size != self._log_offset)):
+            self._index = None
+            self._context = self._load_context()
+            if self._index is None:
+                # Loaded from the server, or the load failed
+                self._index = _ContextIndex(self._context)
+        elif log_size > self._log_offset:
+            self._replay_log(self._context, self._index)
+        return self._context
+    
+    def _current(self) -> Tuple[Dict[str, Any], _ContextIndex]:
+        """Return the current context and its lookup tables."""
+        context = self._get_context()
+        if context is self._context:
+            return context, self._index
+        # Server contexts are loaded fresh for each call
+        return context, _ContextIndex(context)
+    
+    def _record(self, op: str, payload: Dict[str, Any], status: bool = True,
+                current: Optional[Tuple[Dict[str, Any], _ContextIndex]] = None):
+        """Apply a mutation to the current context, or to current if given, and persist it."""
+        context, index = current or self._current()
+        _APPLY[op](context, index, **payload)
+        # Inside a transaction the file key does not move until the block exits
+        self._summary_cache = None
+        if self._txn_events is not None:
+            self._txn_events.append((op, payload))
+        else:
+            self._persist_or_discard(context, [(op, payload)])
+        if status:
+            self._mark_status_dirty(payload["timestamp"])
+    
+    def _persist_or_discard(self, context: Dict[str, Any], events: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Save mutations already applied to context, or drop the cached context if that fails.
+        
+        The mutations are applied before they are written, so after a failed
+        write the cache holds changes that are not on disk; the next call
+        reloads what is. The error is re-raised for the mutator to report.
+        """
+        try:
+            self._persist(context, events)
+        except Exception:
+            self._context = None
+            self._index = None
+            self._summary_cache = None
+            raise
+    
+    def _persist(self, context: Dict[str, Any], events: List[Tuple[str, Dict[str, Any]]]):
+        """Save mutations already applied to context."""
+        if self.use_mcp_server:
+            self._save_context(context)
+        elif self._context_stat is None:
+            # No context file yet to log against; write it whole
+            self._write_snapshot(context)
+        else:
+            self._append_events(events)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Batch several mutations into one save.
+        
+        Mutations made inside the with-block apply to the in-memory context at
+        once and are written together when the block exits: one log append,
+        or one MCP server save. The client lock is held for the whole block.
+        Nested transactions join the outer one. This batches writes only;
+        mutations made before an exception in the block are still saved.
+        """
+        with self._lock:
+            if self._txn_events is not None:
+                yield self
+                return
+            
+            self._txn_events = []
+            try:
+                yield self
+            finally:
+                events, self._txn_events = self._txn_events, None
+                context = self._context
+                if self.use_mcp_server:
+                    # Unpin; the server is asked again from now on
+                    self._context = None
+                if events and context is not None:
+                    self._persist_or_discard(context, events)
+    
+    def _mark_status_dirty(self, timestamp: str):
+        """Schedule a status file rewrite unless one is already pending."""
+        pending = self._status_dirty
+        self._status_dirty = timestamp
+        if pending is None:
+            _submit_write(self, "flush")
+    
+    @_locked
+    def flush(self):
+        """Write the status file if the context changed since it was last written."""
+        if self._status_dirty:
+            timestamp, self._status_dirty = self._status_dirty, None
+            self._create_status_file(self._get_context(), timestamp)
+    
+    @_locked
+    def close(self):
+        """Write the status file and fold the event log into the context file."""
+        self.flush()
+        if self.use_mcp_server or self._context is None:
+            return
+        # Catch up with other writers first so their events are not dropped
+        context = self._get_context()
+        if self._log_events:
+            self._write_snapshot(context)
+    
+    def _create_status_file(self, context: Dict[str, Any], timestamp: Optional[str] = None):
+        """
+        Create a human-readable status file.
+        
+        timestamp is the ISO time of the change being written; the footer shows
+        it to the second, or the current time if none is given.
+        """
+        buf = io.StringIO()
+        write = buf.write
+        write(f"# {self.project_name.upper()} - CONTEXT STATUS\n\n")
+        write(f"## Current Goal\n{context.get('current_goal', 'No goal set')}\n\n")
+        
+        write("## Completed Features\n")
+        write(NL.join([f"- {feature}" for feature in context.get('completed_features', [])]))
+        
+        write("\n\n## Current Issues\n")
+        issues = context.get('current_issues')
+        write(NL.join([f"- {issue}" for issue in issues]) if issues else "No current issues")
+        
+        write("\n\n## Next Steps\n")
+        write(NL.join([f"- {step}" for step in context.get('next_steps', [])]))
+        
+        write("\n\n## Current State\n")
+        write(f"- Development Phase: {context.get('current_state', {}).get('development_phase', 'Unknown')}\n")
+        write(f"- Last Updated: {context.get('last_updated', 'Unknown')}\n\n")
+        
+        write("## Key Files\n")
+        write(NL.join([f"- {file}" for file in context.get('key_files', [])]))
+        
+        write("\n\n## Context Anchors\n")
+        write(NL.join([f"- **{anchor['key']}**: {anchor['value']} - {anchor['description']}"
+                       for anchor in context.get('context_anchors', [])]))
+        
+        footer_time = (timestamp or datetime.now().isoformat())[:19].replace("T", " ")
+        write(f"\n\n---\n*Last updated: {footer_time}*\n")
+        status_content = buf.getvalue()
         
         try:
-            with open(self.status_file, 'w') as f:
-                f.write(status_content)
-            logger.info(f"Status file created at {self.status_file}")
+            _write_file(self._status_path, status_content.encode("utf-8"))
+            logger.info("Status file created at %s", self.status_file)
         except Exception as e:
-            logger.error(f"Failed to create status file: {e}")
+            logger.error("Failed to create status file: %s", e)
     
+    @_locked
     def set_current_goal(self, goal: str) -> bool:
         """Set the current primary goal."""
         try:
-            context = self._load_context()
-            context['current_goal'] = goal
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            self._record("set_current_goal", {"goal": goal, "timestamp": datetime.now().isoformat()})
             return True
         except Exception as e:
-            logger.error(f"Failed to set goal: {e}")
+            logger.error("Failed to set goal: %s", e)
             return False
     
+    @_locked
     def add_completed_feature(self, feature: str) -> bool:
         """Add a completed feature to the status."""
         try:
-            context = self._load_context()
-            completed_features = context.get('completed_features', [])
-            if feature not in completed_features:
-                completed_features.append(feature)
-                context['completed_features'] = completed_features
-                context['last_updated'] = datetime.now().isoformat()
-                self._save_context(context)
-                self._create_status_file(context)
+            current = self._current()
+            if feature not in current[1].features:
+                self._record("add_completed_feature", {"feature": feature, "timestamp": datetime.now().isoformat()},
+                             current=current)
             return True
         except Exception as e:
-            logger.error(f"Failed to add completed feature: {e}")
+            logger.error("Failed to add completed feature: %s", e)
             return False
     
+    @_locked
     def add_current_issue(self, problem: str, location: str = "", root_cause: str = "", status: str = "open") -> bool:
         """Add a current issue to track."""
         try:
-            context = self._load_context()
-            issues = context.get('current_issues', [])
-            
+            timestamp = datetime.now().isoformat()
             issue = {
                 "problem": problem,
                 "location": location,
                 "root_cause": root_cause,
                 "status": status,
-                "created_at": datetime.now().isoformat()
+                "created_at": timestamp
             }
             
-            issues.append(issue)
-            context['current_issues'] = issues
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            self._record("add_current_issue", {"issue": issue, "timestamp": timestamp})
             return True
         except Exception as e:
-            logger.error(f"Failed to add issue: {e}")
+            logger.error("Failed to add issue: %s", e)
             return False
     
+    @_locked
     def add_next_step(self, step: str) -> bool:
         """Add a next step to the plan."""
         try:
-            context = self._load_context()
-            next_steps = context.get('next_steps', [])
-            if step not in next_steps:
-                next_steps.append(step)
-                context['next_steps'] = next_steps
-                context['last_updated'] = datetime.now().isoformat()
-                self._save_context(context)
-                self._create_status_file(context)
+            current = self._current()
+            if step not in current[1].steps:
+                self._record("add_next_step", {"step": step, "timestamp": datetime.now().isoformat()},
+                             current=current)
             return True
         except Exception as e:
-            logger.error(f"Failed to add next step: {e}")
+            logger.error("Failed to add next step: %s", e)
             return False
     
+    @_locked
     def add_context_anchor(self, key: str, value: str, description: str = "", priority: int = 1) -> bool:
         """Add a context anchor for important information."""
         try:
-            context = self._load_context()
-            anchors = context.get('context_anchors', [])
-            
-            # Remove existing anchor with same key
-            anchors = [a for a in anchors if a.get('key') != key]
-            
+            timestamp = datetime.now().isoformat()
             anchor = {
                 "key": key,
                 "value": value,
                 "description": description,
                 "priority": priority,
-                "created_at": datetime.now().isoformat()
+                "created_at": timestamp
             }
             
-            anchors.append(anchor)
-            context['context_anchors'] = anchors
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            self._record("add_context_anchor", {"anchor": anchor, "timestamp": timestamp})
             return True
         except Exception as e:
-            logger.error(f"Failed to add context anchor: {e}")
+            logger.error("Failed to add context anchor: %s", e)
             return False
     
+    @_locked
     def update_current_state(self, state_updates: Dict[str, Any]) -> bool:
         """Update the current state with new information."""
         try:
-            context = self._load_context()
-            current_state = context.get('current_state', {})
-            current_state.update(state_updates)
-            context['current_state'] = current_state
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            current = self._current()
+            # Only keys whose value changes are logged; last_updated moves
+            # either way
+            updates = _changed_state(current[0].get('current_state') or {}, state_updates)
+            self._record("update_current_state", {"updates": updates, "timestamp": datetime.now().isoformat()},
+                         current=current)
             return True
         except Exception as e:
-            logger.error(f"Failed to update state: {e}")
+            logger.error("Failed to update state: %s", e)
             return False
     
     def add_conversation_entry(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Add an entry to the conversation history."""
+        return self.add_conversation_entries([{"role": role, "content": content, "metadata": metadata}])
+    
+    @_locked
+    def add_conversation_entries(self, entries: List[Dict[str, Any]]) -> bool:
+        """
+        Add several entries to the conversation history with a single save.
+        
+        Each entry is a dict with "role", "content" and optional "metadata" keys.
+        """
         try:
-            context = self._load_context()
-            history = context.get('conversation_history', [])
-            
-            entry = {
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat(),
-                "metadata": metadata or {}
-            }
-            
-            history.append(entry)
-            
-            # Keep only last 50 entries to prevent file from growing too large
-            if len(history) > 50:
-                history = history[-50:]
+            timestamp = datetime.now().isoformat()
+            history_entries = [
+                {
+                    "role": entry["role"],
+                    "content": entry["content"],
+                    "timestamp": timestamp,
+                    "metadata": entry.get("metadata") or {}
+                }
+                for entry in entries
+            ]
             
-            context['conversation_history'] = history
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
+            self._record("add_conversation_entries", {"entries": history_entries, "timestamp": timestamp},
+                         status=False)
             return True
         except Exception as e:
-            logger.error(f"Failed to add conversation entry: {e}")
+            logger.error("Failed to add conversation entry: %s", e)
             return False
     
+    @_locked
     def get_context_summary(self) -> Dict[str, Any]:
         """Get a summary of the current context."""
-        context = self._load_context()
-        return {
+        context = self._get_context()
+        if not self.use_mcp_server:
+            key = (self._context_stat, self._log_offset)
+            if self._summary_cache is not None and self._summary_cache[0] == key:
+                return dict(self._summary_cache[1])
+        
+        summary = {
             "project_name": context.get('project_name', ''),
             "current_goal": context.get('current_goal', ''),
             "completed_features_count": len(context.get('completed_features', [])),
@@ -359,43 +959,35 @@ class ContextManagerClient:
             "last_updated": context.get('last_updated', ''),
             "development_phase": context.get('current_state', {}).get('development_phase', 'Unknown')
         }
+        if not self.use_mcp_server:
+            self._summary_cache = (key, summary)
+        return dict(summary)
     
+    @_locked
     def get_full_context(self) -> Dict[str, Any]:
         """Get the complete context data."""
-        return self._load_context()
+        # Callers get their own copy; the cached context is shared by later calls
+        context = copy.deepcopy(self._get_context())
+        if isinstance(context.get('conversation_history'), deque):
+            context['conversation_history'] = list(context['conversation_history'])
+        return context
     
+    @_locked
     def clear_issues(self) -> bool:
         """Clear all current issues."""
         try:
-            context = self._load_context()
-            context['current_issues'] = []
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            self._record("clear_issues", {"timestamp": datetime.now().isoformat()})
             return True
         except Exception as e:
-            logger.error(f"Failed to clear issues: {e}")
+            logger.error("Failed to clear issues: %s", e)
             return False
     
+    @_locked
     def mark_issue_resolved(self, problem: str) -> bool:
         """Mark a specific issue as resolved."""
         try:
-            context = self._load_context()
-            issues = context.get('current_issues', [])
-            
-            for issue in issues:
-                if issue.get('problem') == problem:
-                    issue['status'] = 'resolved'
-                    issue['resolved_at'] = datetime.now().isoformat()
-                    break
-            
-            context['current_issues'] = issues
-            context['last_updated'] = datetime.now().isoformat()
-            self._save_context(context)
-            self._create_status_file(context)
+            self._record("mark_issue_resolved", {"problem": problem, "timestamp": datetime.now().isoformat()})
             return True
         except Exception as e:
-            logger.error(f"Failed to mark issue as resolved: {e}")
+            logger.error("Failed to mark issue as resolved: %s", e)
             return False
-
-
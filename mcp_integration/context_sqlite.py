@@ -0,0 +1,354 @@
+"""
+SQLite storage for the Context Manager client.
+
+SQLiteContextBackend keeps a project's context in a SQLite database instead of
+the JSON context file, so each mutation is a single INSERT/UPDATE rather than
+a rewrite of the whole document. Create it with
+ContextManagerClient(project_name, backend="sqlite").
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from .context_manager_client import ContextManagerClient, _changed_state, _dumps, _loads, _locked, logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS completed_features (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS next_steps (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS current_issues (id INTEGER PRIMARY KEY, problem TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS current_issues_problem ON current_issues (problem);
+CREATE TABLE IF NOT EXISTS context_anchors (id INTEGER PRIMARY KEY, key TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS context_anchors_key ON context_anchors (key);
+CREATE TABLE IF NOT EXISTS conversation_history (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+"""
+
+# Context fields stored as table rows; every other top-level field is a JSON
+# value in meta. Table fields also get a NULL meta row to keep field order.
+_STRING_TABLES = ("completed_features", "next_steps")
+_JSON_TABLES = ("current_issues", "context_anchors", "conversation_history")
+
+# Conversation entries kept in the database
+_HISTORY_LIMIT = 50
+
+
+def _json(value: Any) -> str:
+    return _dumps(value).decode()
+
+
+class SQLiteContextBackend(ContextManagerClient):
+    """ContextManagerClient that stores the context in SQLite."""
+    
+    __slots__ = ("db_file", "_db")
+    
+    def __init__(self, project_name: str = "landscaper", project_root: Optional[str] = None,
+                 backend: str = "sqlite", compress: bool = False):
+        # compress only affects reading a compressed JSON context to import
+        super().__init__(project_name, project_root, compress=compress)
+        # The database replaces both the JSON file and the MCP server
+        self.use_mcp_server = False
+        self.db_file = self.project_root / "contexts" / f"{self.project_name}_context.db"
+        self._db = None
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use, importing the JSON context into a new one."""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            # Calls are serialized by the client lock, so threads may share it
+            db = sqlite3.connect(os.fspath(self.db_file), isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+            if db.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+                # A missing JSON file yields the default context
+                self.import_context(self._load_file_context())
+        return self._db
+    
+    @contextmanager
+    def _savepoint(self):
+        """
+        Group statements atomically.
+        
+        A savepoint starts a transaction on its own and nests inside one opened
+        by transaction(), so mutators work the same either way.
+        """
+        db = self._connection()
+        db.execute("SAVEPOINT write")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK TO write")
+            db.execute("RELEASE write")
+            raise
+        db.execute("RELEASE write")
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Batch several mutations into one database transaction.
+        
+        As with the JSON backend, the client lock is held for the block and
+        mutations made before an exception in it are still saved.
+        """
+        with self._lock:
+            db = self._connection()
+            db.execute("SAVEPOINT txn")
+            try:
+                yield self
+            finally:
+                db.execute("RELEASE txn")
+    
+    def _write(self, statements: List[tuple]):
+        """Run (sql, params) statements in one transaction."""
+        with self._savepoint() as db:
+            for sql, params in statements:
+                db.execute(sql, params)
+    
+    @staticmethod
+    def _set_meta(key: str, value: Any) -> tuple:
+        return ("INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, _json(value)))
+    
+    @_locked
+    def import_context(self, context: Dict[str, Any]):
+        """Replace the stored context with a context document, as read from the JSON file."""
+        statements = [("DELETE FROM " + table, ()) for table in ("meta",) + _STRING_TABLES + _JSON_TABLES]
+        for key, value in context.items():
+            if key in _STRING_TABLES:
+                statements.append(("INSERT INTO meta (key, value) VALUES (?, NULL)", (key,)))
+                statements.extend((f"INSERT OR IGNORE INTO {key} (value) VALUES (?)", (item,)) for item in value)
+            elif key == "current_issues":
+                statements.append(("INSERT INTO meta (key, value) VALUES (?, NULL)", (key,)))
+                statements.extend(("INSERT INTO current_issues (problem, data) VALUES (?, ?)",
+                                   (issue.get('problem') if isinstance(issue, dict) else None, _json(issue)))
+                                  for issue in value)
+            elif key == "context_anchors":
+                statements.append(("INSERT INTO meta (key, value) VALUES (?, NULL)", (key,)))
+                statements.extend(("INSERT INTO context_anchors (key, data) VALUES (?, ?)",
+                                   (anchor.get('key'), _json(anchor)))
+                                  for anchor in value)
+            elif key == "conversation_history":
+                statements.append(("INSERT INTO meta (key, value) VALUES (?, NULL)", (key,)))
+                statements.extend(("INSERT INTO conversation_history (data) VALUES (?)", (_json(entry),))
+                                  for entry in list(value)[-_HISTORY_LIMIT:])
+            else:
+                statements.append(self._set_meta(key, value))
+        self._write(statements)
+    
+    def _get_context(self) -> Dict[str, Any]:
+        """Assemble the context document from the database."""
+        db = self._connection()
+        context = {}
+        for key, value in db.execute("SELECT key, value FROM meta ORDER BY rowid"):
+            if key in _STRING_TABLES:
+                context[key] = [row[0] for row in db.execute(f"SELECT value FROM {key} ORDER BY id")]
+            elif key in _JSON_TABLES:
+                context[key] = [_loads(row[0]) for row in db.execute(f"SELECT data FROM {key} ORDER BY id")]
+            else:
+                context[key] = _loads(value)
+        return context
+    
+    @_locked
+    def set_current_goal(self, goal: str) -> bool:
+        """Set the current primary goal."""
+        try:
+            timestamp = datetime.now().isoformat()
+            self._write([self._set_meta('current_goal', goal), self._set_meta('last_updated', timestamp)])
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to set goal: %s", e)
+            return False
+    
+    def _add_unique(self, table: str, value: str) -> bool:
+        """Insert a string into a de-duplicated list table, stamping last_updated if it was new."""
+        timestamp = datetime.now().isoformat()
+        with self._savepoint() as db:
+            added = db.execute(f"INSERT OR IGNORE INTO {table} (value) VALUES (?)", (value,)).rowcount
+            if added:
+                db.execute(*self._set_meta('last_updated', timestamp))
+        if added:
+            self._mark_status_dirty(timestamp)
+        return True
+    
+    @_locked
+    def add_completed_feature(self, feature: str) -> bool:
+        """Add a completed feature to the status."""
+        try:
+            return self._add_unique("completed_features", feature)
+        except Exception as e:
+            logger.error("Failed to add completed feature: %s", e)
+            return False
+    
+    @_locked
+    def add_current_issue(self, problem: str, location: str = "", root_cause: str = "", status: str = "open") -> bool:
+        """Add a current issue to track."""
+        try:
+            timestamp = datetime.now().isoformat()
+            issue = {
+                "problem": problem,
+                "location": location,
+                "root_cause": root_cause,
+                "status": status,
+                "created_at": timestamp
+            }
+            self._write([
+                ("INSERT INTO current_issues (problem, data) VALUES (?, ?)", (problem, _json(issue))),
+                self._set_meta('last_updated', timestamp),
+            ])
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to add issue: %s", e)
+            return False
+    
+    @_locked
+    def add_next_step(self, step: str) -> bool:
+        """Add a next step to the plan."""
+        try:
+            return self._add_unique("next_steps", step)
+        except Exception as e:
+            logger.error("Failed to add next step: %s", e)
+            return False
+    
+    @_locked
+    def add_context_anchor(self, key: str, value: str, description: str = "", priority: int = 1) -> bool:
+        """Add a context anchor for important information."""
+        try:
+            timestamp = datetime.now().isoformat()
+            anchor = {
+                "key": key,
+                "value": value,
+                "description": description,
+                "priority": priority,
+                "created_at": timestamp
+            }
+            # Replace any existing anchor with the same key
+            self._write([
+                ("DELETE FROM context_anchors WHERE key = ?", (key,)),
+                ("INSERT INTO context_anchors (key, data) VALUES (?, ?)", (key, _json(anchor))),
+                self._set_meta('last_updated', timestamp),
+            ])
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to add context anchor: %s", e)
+            return False
+    
+    @_locked
+    def update_current_state(self, state_updates: Dict[str, Any]) -> bool:
+        """Update the current state with new information."""
+        try:
+            timestamp = datetime.now().isoformat()
+            row = self._connection().execute("SELECT value FROM meta WHERE key = 'current_state'").fetchone()
+            current_state = _loads(row[0]) if row and row[0] else {}
+            statements = [self._set_meta('last_updated', timestamp)]
+            updates = _changed_state(current_state, state_updates)
+            if updates:
+                current_state.update(updates)
+                statements.append(self._set_meta('current_state', current_state))
+            self._write(statements)
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to update state: %s", e)
+            return False
+    
+    @_locked
+    def add_conversation_entries(self, entries: List[Dict[str, Any]]) -> bool:
+        """
+        Add several entries to the conversation history in one transaction.
+        
+        Each entry is a dict with "role", "content" and optional "metadata" keys.
+        """
+        try:
+            timestamp = datetime.now().isoformat()
+            statements = [
+                ("INSERT INTO conversation_history (data) VALUES (?)", (_json({
+                    "role": entry["role"],
+                    "content": entry["content"],
+                    "timestamp": timestamp,
+                    "metadata": entry.get("metadata") or {}
+                }),))
+                for entry in entries
+            ]
+            # Keep only the last entries
+            statements.append(("DELETE FROM conversation_history WHERE id <= "
+                               "(SELECT id FROM conversation_history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                               (_HISTORY_LIMIT,)))
+            statements.append(self._set_meta('last_updated', timestamp))
+            self._write(statements)
+            return True
+        except Exception as e:
+            logger.error("Failed to add conversation entry: %s", e)
+            return False
+    
+    @_locked
+    def get_context_summary(self) -> Dict[str, Any]:
+        """Get a summary of the current context."""
+        db = self._connection()
+        meta = {key: _loads(value) for key, value in db.execute(
+            "SELECT key, value FROM meta WHERE key IN "
+            "('project_name', 'current_goal', 'last_updated', 'current_state') AND value IS NOT NULL")}
+        counts = db.execute(
+            "SELECT (SELECT COUNT(*) FROM completed_features), (SELECT COUNT(*) FROM current_issues), "
+            "(SELECT COUNT(*) FROM next_steps), (SELECT COUNT(*) FROM context_anchors)").fetchone()
+        return {
+            "project_name": meta.get('project_name', ''),
+            "current_goal": meta.get('current_goal', ''),
+            "completed_features_count": counts[0],
+            "current_issues_count": counts[1],
+            "next_steps_count": counts[2],
+            "context_anchors_count": counts[3],
+            "last_updated": meta.get('last_updated', ''),
+            "development_phase": meta.get('current_state', {}).get('development_phase', 'Unknown')
+        }
+    
+    @_locked
+    def get_full_context(self) -> Dict[str, Any]:
+        """Get the complete context data."""
+        return self._get_context()
+    
+    @_locked
+    def clear_issues(self) -> bool:
+        """Clear all current issues."""
+        try:
+            timestamp = datetime.now().isoformat()
+            self._write([("DELETE FROM current_issues", ()), self._set_meta('last_updated', timestamp)])
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to clear issues: %s", e)
+            return False
+    
+    @_locked
+    def mark_issue_resolved(self, problem: str) -> bool:
+        """Mark a specific issue as resolved."""
+        try:
+            timestamp = datetime.now().isoformat()
+            statements = [self._set_meta('last_updated', timestamp)]
+            row = self._connection().execute(
+                "SELECT id, data FROM current_issues WHERE problem = ? ORDER BY id LIMIT 1", (problem,)).fetchone()
+            if row:
+                issue = _loads(row[1])
+                issue['status'] = 'resolved'
+                issue['resolved_at'] = timestamp
+                statements.append(("UPDATE current_issues SET data = ? WHERE id = ?", (_json(issue), row[0])))
+            self._write(statements)
+            self._mark_status_dirty(timestamp)
+            return True
+        except Exception as e:
+            logger.error("Failed to mark issue as resolved: %s", e)
+            return False
+    
+    @_locked
+    def close(self):
+        """Write the status file and close the database."""
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
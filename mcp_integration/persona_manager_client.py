@@ -5,174 +5,357 @@ This client integrates with the persona-manager MCP to provide intelligent
 persona selection and management for the landscaper AI agent.
 """
 
+import atexit
 import json
+import mmap
 import os
-from typing import Dict, List, Optional, Any, Tuple
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Any, Tuple, Union
 from datetime import datetime
+from functools import lru_cache, wraps
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib json module reads and writes the same documents
+    orjson = None
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Persona uses counted in memory before the personas file is rewritten
+_USAGE_FLUSH_EVERY = 10
+
+# Tasks whose best persona is remembered per client
+_SELECTION_CACHE_SIZE = 512
+
+# Clients with usage counts not yet in the personas file, flushed when the
+# interpreter exits
+_dirty_clients = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_dirty_clients():
+    for client in list(_dirty_clients):
+        client.flush()
+
+
+# Default personas for a new personas file; _initialize_landscaper_personas()
+# adds created_at and the usage fields
+_LANDSCAPER_PERSONA_TEMPLATES = (
+    {
+        "id": "customer_service_rep",
+        "name": "Customer Service Representative",
+        "description": "Friendly and professional customer service representative specializing in landscaping services",
+        "expertise": [
+            "Customer Service",
+            "Landscaping Services",
+            "Appointment Scheduling",
+            "Problem Resolution",
+            "Service Recommendations"
+        ],
+        "communication_style": "Warm, professional, and helpful",
+        "context": "Use for customer inquiries, service questions, appointment scheduling, and general support",
+        "personality_traits": ["empathetic", "patient", "solution-oriented", "professional"],
+        "task_categories": ["customer_service", "business"],
+        "audience": "customers",
+        "output_format": "conversational"
+    },
+    {
+        "id": "landscaping_expert",
+        "name": "Landscaping Expert",
+        "description": "Professional landscaper with extensive knowledge of plants, design, and maintenance",
+        "expertise": [
+            "Landscape Design",
+            "Plant Selection",
+            "Garden Maintenance",
+            "Seasonal Care",
+            "Pest Management",
+            "Irrigation Systems",
+            "Hardscaping"
+        ],
+        "communication_style": "Knowledgeable, detailed, and educational",
+        "context": "Use for technical landscaping questions, design consultations, plant care advice, and maintenance recommendations",
+        "personality_traits": ["knowledgeable", "detail-oriented", "passionate", "educational"],
+        "task_categories": ["technical", "consulting", "educational"],
+        "audience": "customers",
+        "output_format": "educational"
+    },
+    {
+        "id": "sales_specialist",
+        "name": "Sales Specialist",
+        "description": "Experienced sales professional focused on landscaping services and project proposals",
+        "expertise": [
+            "Sales",
+            "Project Proposals",
+            "Cost Estimation",
+            "Service Packages",
+            "Customer Needs Assessment",
+            "Follow-up"
+        ],
+        "communication_style": "Persuasive, consultative, and results-oriented",
+        "context": "Use for sales inquiries, project proposals, cost estimates, and converting leads to customers",
+        "personality_traits": ["persuasive", "consultative", "results-oriented", "confident"],
+        "task_categories": ["business", "sales"],
+        "audience": "prospects",
+        "output_format": "persuasive"
+    },
+    {
+        "id": "technical_support",
+        "name": "Technical Support",
+        "description": "Technical support specialist for website and app-related issues",
+        "expertise": [
+            "Technical Support",
+            "Website Navigation",
+            "Mobile App Issues",
+            "Browser Compatibility",
+            "Troubleshooting",
+            "User Experience"
+        ],
+        "communication_style": "Clear, step-by-step, and patient",
+        "context": "Use for technical issues with the website, mobile app problems, navigation help, and user experience questions",
+        "personality_traits": ["patient", "methodical", "clear", "helpful"],
+        "task_categories": ["technical", "support"],
+        "audience": "users",
+        "output_format": "instructional"
+    },
+    {
+        "id": "emergency_responder",
+        "name": "Emergency Response Specialist",
+        "description": "Specialist for urgent landscaping emergencies and immediate assistance needs",
+        "expertise": [
+            "Emergency Response",
+            "Storm Damage",
+            "Tree Removal",
+            "Urgent Repairs",
+            "Safety Assessment",
+            "Crisis Management"
+        ],
+        "communication_style": "Urgent, reassuring, and action-oriented",
+        "context": "Use for emergency situations, storm damage, urgent tree removal, safety concerns, and immediate assistance requests",
+        "personality_traits": ["urgent", "reassuring", "action-oriented", "calm"],
+        "task_categories": ["emergency", "technical"],
+        "audience": "customers",
+        "output_format": "urgent"
+    }
+)
+
+
+# Keywords that mark a task's category, and the persona task_categories that
+# earn the category bonus for it; the first matching row wins
+_TASK_CATEGORY_RULES = (
+    (('customer', 'service', 'help', 'support'), ('customer_service', 'support')),
+    (('technical', 'design', 'plant', 'garden'), ('technical', 'consulting')),
+    (('sales', 'price', 'cost', 'quote'), ('business', 'sales')),
+    (('emergency', 'urgent', 'storm', 'damage'), ('emergency',)),
+)
+
+
+def _task_categories(task: str) -> Tuple[str, ...]:
+    """Return the persona task_categories that match a lowercased task."""
+    for keywords, categories in _TASK_CATEGORY_RULES:
+        if any(keyword in task for keyword in keywords):
+            return categories
+    return ()
+
+
+class PersonaSuggestion(NamedTuple):
+    """A persona suggested for a task, with its score."""
+    persona: Dict[str, Any]
+    score: float
+
+
+class _ScoringTokens(NamedTuple):
+    """Lowercased persona fields compared against a task."""
+    name: str
+    description_words: frozenset
+    expertise: Tuple[str, ...]
+    context: str
+
+
+@lru_cache(maxsize=256)
+def _scoring_tokens(name: str, description: str, expertise: Tuple[str, ...], context: str) -> _ScoringTokens:
+    """
+    Lowercased persona fields used for scoring.
+    
+    Keyed on the field values themselves, so an edited persona gets fresh
+    tokens while an unchanged one is tokenized once.
+    """
+    return _ScoringTokens(name.lower(), frozenset(description.lower().split()),
+                          tuple(e.lower() for e in expertise), context.lower())
+
+
+def _locked(method):
+    """Run a client method while holding the client's lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _dumps(personas: Dict[str, Any]) -> bytes:
+    """Serialize personas to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(personas)
+    return json.dumps(personas, separators=(",", ":")).encode()
+
 
 class PersonaManagerClient:
     """Client for interacting with the Persona Manager MCP."""
     
+    __slots__ = ("personas_dir", "personas_file", "_personas", "_personas_stat", "_personas_version",
+                 "_pending_usage", "_selection_cache", "_lock", "__weakref__")
+    
     def __init__(self, personas_dir: Optional[str] = None):
         self.personas_dir = Path(personas_dir) if personas_dir else Path.cwd() / "personas"
-        self.personas_dir.mkdir(exist_ok=True)
         self.personas_file = self.personas_dir / "landscaper_personas.json"
         
-        # Initialize personas if they don't exist
-        if not self.personas_file.exists():
-            self._initialize_landscaper_personas()
+        # Parsed personas kept between calls, with the (mtime, size) of the file
+        # they were read from
+        self._personas = None
+        self._personas_stat = None
+        
+        # persona id -> [uses, last used] not yet saved; applied to the cached
+        # personas straight away and written by flush()
+        self._pending_usage = {}
+        
+        # Bumped by every save, which may have changed the cached personas in
+        # place; see select_best_persona()
+        self._personas_version = 0
+        # lowercased task -> (personas, version, best persona key, score),
+        # least recently used first
+        self._selection_cache = OrderedDict()
+        
+        # Guards the cached personas, pending usage and selection cache; usage
+        # may be recorded from a worker thread while requests select personas.
+        # Reentrant because a usage update can flush, which saves and reloads.
+        self._lock = threading.RLock()
+        
+        # Nothing is read or written here: a missing personas file is created
+        # with the default personas by the first load
     
     def _initialize_landscaper_personas(self):
         """Initialize landscaper-specific personas."""
+        created_at = datetime.now().isoformat()
         landscaper_personas = {
-            "customer_service_rep": {
-                "id": "customer_service_rep",
-                "name": "Customer Service Representative",
-                "description": "Friendly and professional customer service representative specializing in landscaping services",
-                "expertise": [
-                    "Customer Service",
-                    "Landscaping Services",
-                    "Appointment Scheduling",
-                    "Problem Resolution",
-                    "Service Recommendations"
-                ],
-                "communication_style": "Warm, professional, and helpful",
-                "context": "Use for customer inquiries, service questions, appointment scheduling, and general support",
-                "personality_traits": ["empathetic", "patient", "solution-oriented", "professional"],
-                "task_categories": ["customer_service", "business"],
-                "audience": "customers",
-                "output_format": "conversational",
-                "created_at": datetime.now().isoformat(),
-                "usage_count": 0,
-                "last_used": None
-            },
-            "landscaping_expert": {
-                "id": "landscaping_expert",
-                "name": "Landscaping Expert",
-                "description": "Professional landscaper with extensive knowledge of plants, design, and maintenance",
-                "expertise": [
-                    "Landscape Design",
-                    "Plant Selection",
-                    "Garden Maintenance",
-                    "Seasonal Care",
-                    "Pest Management",
-                    "Irrigation Systems",
-                    "Hardscaping"
-                ],
-                "communication_style": "Knowledgeable, detailed, and educational",
-                "context": "Use for technical landscaping questions, design consultations, plant care advice, and maintenance recommendations",
-                "personality_traits": ["knowledgeable", "detail-oriented", "passionate", "educational"],
-                "task_categories": ["technical", "consulting", "educational"],
-                "audience": "customers",
-                "output_format": "educational",
-                "created_at": datetime.now().isoformat(),
-                "usage_count": 0,
-                "last_used": None
-            },
-            "sales_specialist": {
-                "id": "sales_specialist",
-                "name": "Sales Specialist",
-                "description": "Experienced sales professional focused on landscaping services and project proposals",
-                "expertise": [
-                    "Sales",
-                    "Project Proposals",
-                    "Cost Estimation",
-                    "Service Packages",
-                    "Customer Needs Assessment",
-                    "Follow-up"
-                ],
-                "communication_style": "Persuasive, consultative, and results-oriented",
-                "context": "Use for sales inquiries, project proposals, cost estimates, and converting leads to customers",
-                "personality_traits": ["persuasive", "consultative", "results-oriented", "confident"],
-                "task_categories": ["business", "sales"],
-                "audience": "prospects",
-                "output_format": "persuasive",
-                "created_at": datetime.now().isoformat(),
-                "usage_count": 0,
-                "last_used": None
-            },
-            "technical_support": {
-                "id": "technical_support",
-                "name": "Technical Support",
-                "description": "Technical support specialist for website and app-related issues",
-                "expertise": [
-                    "Technical Support",
-                    "Website Navigation",
-                    "Mobile App Issues",
-                    "Browser Compatibility",
-                    "Troubleshooting",
-                    "User Experience"
-                ],
-                "communication_style": "Clear, step-by-step, and patient",
-                "context": "Use for technical issues with the website, mobile app problems, navigation help, and user experience questions",
-                "personality_traits": ["patient", "methodical", "clear", "helpful"],
-                "task_categories": ["technical", "support"],
-                "audience": "users",
-                "output_format": "instructional",
-                "created_at": datetime.now().isoformat(),
-                "usage_count": 0,
-                "last_used": None
-            },
-            "emergency_responder": {
-                "id": "emergency_responder",
-                "name": "Emergency Response Specialist",
-                "description": "Specialist for urgent landscaping emergencies and immediate assistance needs",
-                "expertise": [
-                    "Emergency Response",
-                    "Storm Damage",
-                    "Tree Removal",
-                    "Urgent Repairs",
-                    "Safety Assessment",
-                    "Crisis Management"
-                ],
-                "communication_style": "Urgent, reassuring, and action-oriented",
-                "context": "Use for emergency situations, storm damage, urgent tree removal, safety concerns, and immediate assistance requests",
-                "personality_traits": ["urgent", "reassuring", "action-oriented", "calm"],
-                "task_categories": ["emergency", "technical"],
-                "audience": "customers",
-                "output_format": "urgent",
-                "created_at": datetime.now().isoformat(),
-                "usage_count": 0,
-                "last_used": None
-            }
+            template["id"]: {**template, "created_at": created_at, "usage_count": 0, "last_used": None}
+            for template in _LANDSCAPER_PERSONA_TEMPLATES
         }
         
         self._save_personas(landscaper_personas)
         logger.info("Initialized landscaper personas")
     
+    @_locked
     def _save_personas(self, personas: Dict[str, Any]):
-        """Save personas to JSON file."""
+        """
+        Save personas to JSON file.
+        
+        The file is written compactly to a temporary file that is renamed over
+        it, so a crash never leaves it half-written.
+        """
+        tmp = f"{self.personas_file}.{os.getpid()}.{threading.get_ident()}.tmp"
         try:
-            with open(self.personas_file, 'w') as f:
-                json.dump(personas, f, indent=2)
-            logger.info(f"Personas saved to {self.personas_file}")
+            data = _dumps(personas)
+            try:
+                try:
+                    f = open(tmp, 'wb')
+                except FileNotFoundError:
+                    # First write; create the personas directory
+                    self.personas_dir.mkdir(exist_ok=True)
+                    f = open(tmp, 'wb')
+                with f:
+                    f.write(data)
+                    st = os.fstat(f.fileno())
+                os.replace(tmp, self.personas_file)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+            self._personas = personas
+            self._personas_stat = (st.st_mtime_ns, st.st_size)
+            self._personas_version += 1
+            # Pending usage was applied to personas and is saved with them
+            self._pending_usage.clear()
+            _dirty_clients.discard(self)
+            logger.info("Personas saved to %s", self.personas_file)
         except Exception as e:
-            logger.error(f"Failed to save personas: {e}")
+            # Drop any unsaved changes made to the cached personas
+            self._personas = None
+            logger.error("Failed to save personas: %s", e)
+    
+    def _file_stat(self) -> Optional[tuple]:
+        """Return (mtime_ns, size) of the personas file, or None if it is missing."""
+        try:
+            st = os.stat(self.personas_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
     
+    @_locked
     def _load_personas(self) -> Dict[str, Any]:
-        """Load personas from JSON file."""
+        """
+        Load personas from JSON file.
+        
+        The parsed personas are reused until the file changes on disk, so the
+        returned dict is shared: mutate it only to save it back.
+        """
+        stat = self._file_stat()
+        if self._personas is not None and stat == self._personas_stat:
+            return self._personas
         try:
-            with open(self.personas_file, 'r') as f:
-                return json.load(f)
+            with open(self.personas_file, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if orjson is None or st.st_size == 0:
+                    personas = _loads(f.read())
+                else:
+                    # Parse straight from the page cache instead of copying
+                    # the file into a bytes object first
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                        personas = orjson.loads(view)
+        except FileNotFoundError:
+            self._initialize_landscaper_personas()
+            return self._personas if self._personas is not None else {}
         except Exception as e:
-            logger.error(f"Failed to load personas: {e}")
+            logger.error("Failed to load personas: %s", e)
             return {}
+        # Usage not yet saved goes on top of what another writer saved
+        for persona_id, (uses, last_used) in self._pending_usage.items():
+            persona = personas.get(persona_id)
+            if persona is not None:
+                personas[persona_id] = {
+                    **persona,
+                    'usage_count': persona.get('usage_count', 0) + uses,
+                    'last_used': last_used
+                }
+        self._personas = personas
+        self._personas_stat = (st.st_mtime_ns, st.st_size)
+        return personas
     
-    def list_personas(self) -> List[Dict[str, Any]]:
-        """List all available personas."""
+    def list_personas(self, stream: bool = False) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """List all available personas, or yield them one at a time if stream is set."""
+        if stream:
+            return self.iter_personas()
         personas = self._load_personas()
         return list(personas.values())
     
+    def iter_personas(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over available personas without building a list."""
+        yield from self._load_personas().values()
+    
     def get_persona(self, persona_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific persona by ID."""
         personas = self._load_personas()
         return personas.get(persona_id)
     
+    @_locked
     def create_persona(self, persona_data: Dict[str, Any]) -> bool:
         """Create a new persona."""
         try:
@@ -189,12 +372,13 @@ class PersonaManagerClient:
             
             personas[persona_id] = persona_data
             self._save_personas(personas)
-            logger.info(f"Created persona: {persona_id}")
+            logger.info("Created persona: %s", persona_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to create persona: {e}")
+            logger.error("Failed to create persona: %s", e)
             return False
     
+    @_locked
     def update_persona(self, persona_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing persona."""
         try:
@@ -202,15 +386,17 @@ class PersonaManagerClient:
             if persona_id not in personas:
                 return False
             
-            personas[persona_id].update(updates)
-            personas[persona_id]['updated_at'] = datetime.now().isoformat()
+            # Replace rather than mutate, so personas handed out earlier keep
+            # their values
+            personas[persona_id] = {**personas[persona_id], **updates, 'updated_at': datetime.now().isoformat()}
             self._save_personas(personas)
-            logger.info(f"Updated persona: {persona_id}")
+            logger.info("Updated persona: %s", persona_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to update persona: {e}")
+            logger.error("Failed to update persona: %s", e)
             return False
     
+    @_locked
     def delete_persona(self, persona_id: str) -> bool:
         """Delete a persona."""
         try:
@@ -220,10 +406,10 @@ class PersonaManagerClient:
             
             del personas[persona_id]
             self._save_personas(personas)
-            logger.info(f"Deleted persona: {persona_id}")
+            logger.info("Deleted persona: %s", persona_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete persona: {e}")
+            logger.error("Failed to delete persona: %s", e)
             return False
     
     def search_personas(self, query: str) -> List[Dict[str, Any]]:
@@ -241,24 +427,41 @@ class PersonaManagerClient:
         
         return results
     
-    def select_best_persona(self, task: str, context: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], float]:
-        """Select the best persona for a given task with confidence score."""
-        personas = self._load_personas()
+    @_locked
+    def select_best_persona(self, task: str, context: Optional[Dict[str, Any]] = None,
+                            personas: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Select the best persona for a given task with confidence score.
+        
+        Callers that keep their own copy of the catalog can pass it as personas
+        to skip reading the personas file. The result for a task is remembered
+        until the personas change; context does not affect scores. Runs under
+        the client lock, so usage recorded from another thread cannot change
+        the personas or the selection cache mid-selection.
+        """
+        if personas is None:
+            personas = self._load_personas()
         if not personas:
             return None, 0.0
         
-        best_persona = None
-        best_score = 0.0
-        
         task_lower = task.lower()
-        context_info = context or {}
-        
-        for persona in personas.values():
-            score = self._calculate_persona_score(persona, task_lower, context_info)
-            
-            if score > best_score:
-                best_score = score
-                best_persona = persona
+        cached = self._selection_cache.get(task_lower)
+        if cached is not None and cached[0] is personas and cached[1] == self._personas_version:
+            self._selection_cache.move_to_end(task_lower)
+            best_key, best_score = cached[2], cached[3]
+        else:
+            best_key = None
+            best_score = 0.0
+            for key, (persona, score) in zip(personas, self._score_personas(personas.values(), task_lower,
+                                                                             context or {})):
+                if score > best_score:
+                    best_score = score
+                    best_key = key
+            # Holding personas keeps its id from being reused while cached
+            self._selection_cache[task_lower] = (personas, self._personas_version, best_key, best_score)
+            if len(self._selection_cache) > _SELECTION_CACHE_SIZE:
+                self._selection_cache.popitem(last=False)
+        best_persona = personas.get(best_key) if best_key is not None else None
         
         # Update usage statistics
         if best_persona:
@@ -266,86 +469,120 @@ class PersonaManagerClient:
         
         return best_persona, best_score
     
-    def _calculate_persona_score(self, persona: Dict[str, Any], task: str, context: Dict[str, Any]) -> float:
-        """Calculate how well a persona matches a task."""
+    def score_persona(self, persona: Dict[str, Any], task: str, context: Optional[Dict[str, Any]] = None) -> float:
+        """Score how well one persona matches a task, on the scale select_best_persona reports."""
+        return self._calculate_persona_score(persona, task.lower(), context or {})
+    
+    def _score_personas(self, personas: Iterable[Dict[str, Any]], task: str,
+                        context: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], float]]:
+        """
+        Yield (persona, score) for each persona against a task.
+        
+        Everything derived from the task alone is worked out once here, so
+        each persona costs only lookups against its cached tokens.
+        """
+        task_lower = task.lower()
+        task_words = frozenset(task_lower.split())
+        categories = _task_categories(task_lower)
+        for persona in personas:
+            yield persona, self._calculate_persona_score(persona, task_lower, context, task_words, categories)
+    
+    def _calculate_persona_score(self, persona: Dict[str, Any], task: str, context: Dict[str, Any],
+                                 task_words: Optional[frozenset] = None,
+                                 categories: Optional[Tuple[str, ...]] = None) -> float:
+        """
+        Calculate how well a persona matches a task.
+        
+        task is lowercased; _score_personas passes its words and matching
+        categories so they are worked out once per task.
+        """
+        if task_words is None:
+            task_words = frozenset(task.split())
+        if categories is None:
+            categories = _task_categories(task)
+        name, description_words, expertise_list, persona_context = _scoring_tokens(
+            persona.get('name', ''), persona.get('description', ''),
+            tuple(persona.get('expertise', [])), persona.get('context', ''))
         score = 0.0
         
-        # Expertise matching (40% weight)
-        expertise_score = 0.0
-        expertise_list = persona.get('expertise', [])
-        for expertise in expertise_list:
-            if expertise.lower() in task:
-                expertise_score += 1.0
+        # Expertise matching (40% weight); map() runs the substring checks
+        # without a Python-level loop
+        expertise_score = float(sum(map(task.__contains__, expertise_list)))
         
         if expertise_list:
             expertise_score = min(expertise_score / len(expertise_list), 1.0)
         score += expertise_score * 0.4
         
         # Name relevance (20% weight)
-        name = persona.get('name', '').lower()
-        if any(word in name for word in task.split()):
+        if any(map(name.__contains__, task_words)):
             score += 0.2
         
         # Description similarity (20% weight)
-        description = persona.get('description', '').lower()
-        description_words = set(description.split())
-        task_words = set(task.split())
         if description_words and task_words:
             similarity = len(description_words.intersection(task_words)) / len(description_words.union(task_words))
             score += similarity * 0.2
         
         # Context alignment (10% weight)
-        persona_context = persona.get('context', '').lower()
-        if any(word in persona_context for word in task.split()):
+        if any(map(persona_context.__contains__, task_words)):
             score += 0.1
         
         # Task category matching (10% weight)
-        task_categories = persona.get('task_categories', [])
-        if task_categories:
-            # Simple keyword-based category detection
-            if any(cat in task for cat in ['customer', 'service', 'help', 'support']):
-                if 'customer_service' in task_categories or 'support' in task_categories:
-                    score += 0.1
-            elif any(cat in task for cat in ['technical', 'design', 'plant', 'garden']):
-                if 'technical' in task_categories or 'consulting' in task_categories:
-                    score += 0.1
-            elif any(cat in task for cat in ['sales', 'price', 'cost', 'quote']):
-                if 'business' in task_categories or 'sales' in task_categories:
-                    score += 0.1
-            elif any(cat in task for cat in ['emergency', 'urgent', 'storm', 'damage']):
-                if 'emergency' in task_categories:
-                    score += 0.1
+        task_categories = persona.get('task_categories')
+        if task_categories and any(category in task_categories for category in categories):
+            score += 0.1
         
         return min(score, 1.0)
     
-    def get_persona_suggestions(self, task: str, limit: int = 3) -> List[Tuple[Dict[str, Any], float]]:
-        """Get multiple persona suggestions with scores."""
+    def get_persona_suggestions(self, task: str, limit: int = 3) -> List[PersonaSuggestion]:
+        """Get multiple persona suggestions with scores, as (persona, score) tuples."""
         personas = self._load_personas()
         if not personas:
             return []
         
-        suggestions = []
-        task_lower = task.lower()
-        
-        for persona in personas.values():
-            score = self._calculate_persona_score(persona, task_lower, {})
-            if score > 0.1:  # Only include personas with some relevance
-                suggestions.append((persona, score))
+        # Only include personas with some relevance
+        suggestions = [PersonaSuggestion(persona, score)
+                       for persona, score in self._score_personas(personas.values(), task, {}) if score > 0.1]
         
         # Sort by score (descending) and return top suggestions
-        suggestions.sort(key=lambda x: x[1], reverse=True)
+        suggestions.sort(key=lambda suggestion: suggestion.score, reverse=True)
         return suggestions[:limit]
     
+    def record_usage(self, persona_id: str):
+        """Count a use of a persona chosen without select_best_persona."""
+        self._update_persona_usage(persona_id)
+    
+    @_locked
     def _update_persona_usage(self, persona_id: str):
-        """Update persona usage statistics."""
+        """
+        Update persona usage statistics.
+        
+        The count is updated in memory and saved with the next persona write,
+        every _USAGE_FLUSH_EVERY uses, or by flush().
+        """
         try:
             personas = self._load_personas()
-            if persona_id in personas:
-                personas[persona_id]['usage_count'] = personas[persona_id].get('usage_count', 0) + 1
-                personas[persona_id]['last_used'] = datetime.now().isoformat()
-                self._save_personas(personas)
+            persona = personas.get(persona_id)
+            if persona is not None:
+                last_used = datetime.now().isoformat()
+                personas[persona_id] = {
+                    **persona,
+                    'usage_count': persona.get('usage_count', 0) + 1,
+                    'last_used': last_used
+                }
+                pending = self._pending_usage.setdefault(persona_id, [0, None])
+                pending[0] += 1
+                pending[1] = last_used
+                _dirty_clients.add(self)
+                if sum(uses for uses, _ in self._pending_usage.values()) >= _USAGE_FLUSH_EVERY:
+                    self.flush()
         except Exception as e:
-            logger.error(f"Failed to update persona usage: {e}")
+            logger.error("Failed to update persona usage: %s", e)
+    
+    @_locked
+    def flush(self):
+        """Save usage counts not yet written to the personas file."""
+        if self._pending_usage:
+            self._save_personas(self._load_personas())
     
     def get_persona_statistics(self) -> Dict[str, Any]:
         """Get statistics about persona usage."""
@@ -378,14 +615,16 @@ class PersonaManagerClient:
             else:
                 backup_path = Path(backup_path)
             
-            personas = self._load_personas()
-            with open(backup_path, 'w') as f:
-                json.dump(personas, f, indent=2)
+            # Make sure the file exists and holds any pending usage, then copy
+            # its bytes as they are
+            self._load_personas()
+            self.flush()
+            shutil.copyfile(self.personas_file, backup_path)
             
-            logger.info(f"Personas backed up to {backup_path}")
+            logger.info("Personas backed up to %s", backup_path)
             return True
         except Exception as e:
-            logger.error(f"Failed to backup personas: {e}")
+            logger.error("Failed to backup personas: %s", e)
             return False
 
 
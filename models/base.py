@@ -3,7 +3,8 @@ Base database configuration and setup
 """
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Date, DateTime, Enum, Numeric
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -21,6 +22,50 @@ DATABASE_CONFIG = {
     'password': os.environ.get('DB_PASSWORD', 'landscaper_password_2024')
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', '20')),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '20')),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+}
+
+# Model class -> ((column name, converter or None), ...) used by to_dict()
+_dict_fields = {}
+
+def _column_converter(column_type):
+    """Return the function that makes a column's values JSON-ready, or None if they already are"""
+    if isinstance(column_type, UUID):
+        return str
+    if isinstance(column_type, (DateTime, Date)):
+        return lambda value: value.isoformat()
+    if isinstance(column_type, Numeric):
+        return float
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        # Plain strings assigned since the row was loaded pass through
+        return lambda value: getattr(value, 'value', value)
+    return None
+
+class SerializableMixin:
+    """Provides to_dict() from the model's table columns"""
+    
+    def to_dict(self):
+        """Convert model to dictionary"""
+        cls = type(self)
+        fields = _dict_fields.get(cls)
+        if fields is None:
+            # Worked out once per model from its columns
+            fields = _dict_fields[cls] = tuple(
+                (column.name, _column_converter(column.type)) for column in cls.__table__.columns
+            )
+        
+        data = {}
+        for name, convert in fields:
+            value = getattr(self, name)
+            if convert is not None:
+                value = convert(value) if value else None
+            data[name] = value
+        return data
+
 def get_database_url():
     """Get database URL from environment or use defaults"""
     return f"postgresql://{DATABASE_CONFIG['username']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
@@ -30,15 +75,27 @@ def init_database(app):
     app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'connect_args': {'connect_timeout': 10}
+        **POOL_CONFIG,
+        # Reuse the most recently returned connection so idle ones can expire
+        'pool_use_lifo': True,
+        # TCP keepalives detect dead connections instead of a ping on every checkout
+        'pool_pre_ping': False,
+        'connect_args': {
+            'connect_timeout': 10,
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 3
+        }
     }
     
     db.init_app(app)
     
-    with app.app_context():
-        # Create all tables
-        db.create_all()
+    # The schema comes from database/schema.sql; creating missing tables
+    # from the models on startup is opt-in
+    if os.environ.get('DB_AUTO_CREATE_TABLES') == '1':
+        with app.app_context():
+            # Create all tables
+            db.create_all()
     
     return db
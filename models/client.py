@@ -5,10 +5,10 @@ Client model for landscaping clients
 from sqlalchemy import Column, String, Text, Boolean, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from .base import db
+from .base import db, SerializableMixin
 import uuid
 
-class Client(db.Model):
+class Client(SerializableMixin, db.Model):
     __tablename__ = 'clients'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -30,22 +30,6 @@ class Client(db.Model):
     
     def to_dict(self):
         """Convert model to dictionary"""
-        return {
-            'id': str(self.id),
-            'company_name': self.company_name,
-            'contact_first_name': self.contact_first_name,
-            'contact_last_name': self.contact_last_name,
-            'display_name': f"{self.contact_first_name} {self.contact_last_name}",
-            'email': self.email,
-            'phone': self.phone,
-            'address_line1': self.address_line1,
-            'address_line2': self.address_line2,
-            'city': self.city,
-            'state': self.state,
-            'postal_code': self.postal_code,
-            'country': self.country,
-            'notes': self.notes,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = super().to_dict()
+        data['display_name'] = f"{self.contact_first_name} {self.contact_last_name}"
+        return data
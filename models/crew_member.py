@@ -2,10 +2,10 @@
 Crew member model for landscaping staff
 """
 
-from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Date, Enum
+from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Date, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from .base import db
+from .base import db, SerializableMixin
 import enum
 import uuid
 
@@ -16,15 +16,20 @@ class CrewRole(enum.Enum):
     LABORER = "laborer"
     SPECIALIST = "specialist"
 
-class CrewMember(db.Model):
+class CrewMember(SerializableMixin, db.Model):
     __tablename__ = 'crew_members'
+    __table_args__ = (
+        Index('idx_crew_members_role', 'role'),
+        Index('idx_crew_members_is_active', 'is_active'),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True)
     phone = Column(String(20))
-    role = Column(String(50), nullable=False)  # Use String instead of Enum
+    role = Column(Enum(CrewRole, name='crew_role', values_callable=lambda roles: [role.value for role in roles]),
+                  nullable=False)
     hire_date = Column(Date)
     hourly_rate = Column(DECIMAL(8, 2))
     is_active = Column(Boolean, default=True)
@@ -36,20 +41,6 @@ class CrewMember(db.Model):
     
     def to_dict(self):
         """Convert model to dictionary"""
-        return {
-            'id': str(self.id),
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'full_name': f"{self.first_name} {self.last_name}",
-            'email': self.email,
-            'phone': self.phone,
-            'role': self.role,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'hourly_rate': float(self.hourly_rate) if self.hourly_rate else None,
-            'is_active': self.is_active,
-            'emergency_contact_name': self.emergency_contact_name,
-            'emergency_contact_phone': self.emergency_contact_phone,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = super().to_dict()
+        data['full_name'] = f"{self.first_name} {self.last_name}"
+        return data
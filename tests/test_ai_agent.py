@@ -0,0 +1,49 @@
+"""Tests for the agent's persona routing."""
+
+import pytest
+
+from mcp_integration import context_manager_client as cmc
+from mcp_integration.ai_agent import LandscaperAIAgent
+from mcp_integration.context_manager_client import ContextManagerClient
+from mcp_integration.persona_manager_client import PersonaManagerClient
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """Agent whose clients use files under tmp_path and never look for an MCP server."""
+    monkeypatch.setattr(cmc, "_probe_mcp_server", lambda server_url: False)
+    agent = LandscaperAIAgent("demo")
+    agent._context_manager = ContextManagerClient("demo", project_root=str(tmp_path))
+    agent._persona_manager = PersonaManagerClient(str(tmp_path / "personas"))
+    yield agent
+    agent.close()
+
+
+@pytest.mark.parametrize("query", [
+    "Help me brainstorm a garden design with native plants",
+    "Is this antique fountain priceless?",
+    "How do I unquote text on the website?",
+])
+def test_words_containing_a_route_keyword_are_not_routed(agent, query):
+    assert agent._route_persona(query.lower()) == (None, 0.0)
+
+
+def test_brainstorm_is_not_an_emergency(agent):
+    result = agent.process_user_query("Help me brainstorm a garden design with native plants")
+    assert result.persona_id != "emergency_responder"
+    assert result.confidence < 1.0
+
+
+@pytest.mark.parametrize("query, persona_id", [
+    ("Storm damage! A tree fell on the fence", "emergency_responder"),
+    ("Urgent: what does a quote cost?", "emergency_responder"),
+    ("Can I get a quote for a patio?", "sales_specialist"),
+    ("What are your prices?", "sales_specialist"),
+    ("I need an appointment next week", "customer_service_rep"),
+])
+def test_whole_route_words_are_routed(agent, query, persona_id):
+    persona, confidence = agent._route_persona(query.lower())
+    assert persona["id"] == persona_id
+    # The confidence is the persona's real score, not a fixed 1.0
+    assert confidence == agent.persona_manager.score_persona(persona, query)
+    assert 0.0 <= confidence < 1.0
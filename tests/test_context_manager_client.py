@@ -0,0 +1,262 @@
+"""Tests for the file-based context client: its event log and transactions."""
+
+import os
+
+import pytest
+
+from mcp_integration import context_manager_client as cmc
+from mcp_integration.context_manager_client import ContextManagerClient
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """Build file-based clients for one project whose background writes run inline."""
+    monkeypatch.setattr(cmc, "_probe_mcp_server", lambda server_url: False)
+    monkeypatch.setattr(cmc, "_submit_write", lambda client, method: getattr(client, method)())
+    return lambda: ContextManagerClient("demo", project_root=str(tmp_path))
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_events_replay_onto_a_fresh_client(make_client):
+    writer = make_client()
+    writer.set_current_goal("Ship the quote page")  # Writes the context file
+    writer.add_next_step("Review copy")
+    writer.add_completed_feature("Wall calculator")
+    writer.add_conversation_entry("user", "hello")
+    assert writer._log_events == 3
+
+    reader = make_client()
+    context = reader.get_full_context()
+    assert context == writer.get_full_context()
+    assert context["current_goal"] == "Ship the quote page"
+    assert context["next_steps"][-1] == "Review copy"
+    assert context["completed_features"][-1] == "Wall calculator"
+    assert context["conversation_history"][-1]["content"] == "hello"
+
+
+def test_reader_replays_events_appended_after_it_loaded(make_client):
+    writer = make_client()
+    writer.set_current_goal("First goal")
+    reader = make_client()
+    assert reader.get_full_context()["current_goal"] == "First goal"
+
+    writer.add_next_step("Appended later")
+
+    assert reader.get_full_context()["next_steps"][-1] == "Appended later"
+
+
+def test_log_is_compacted_after_100_events(make_client):
+    client = make_client()
+    client.set_current_goal("Start")  # Writes the context file; not logged
+    for i in range(cmc._COMPACT_EVERY - 1):
+        client.add_next_step(f"step {i}")
+    assert client._log_events == cmc._COMPACT_EVERY - 1
+    assert os.path.getsize(client.log_file) > 0
+
+    client.add_next_step("the hundredth event")
+
+    assert client._log_events == 0
+    assert os.path.getsize(client.log_file) == 0
+    fresh = make_client()
+    assert fresh.get_full_context() == client.get_full_context()
+    assert fresh.get_full_context()["next_steps"][-1] == "the hundredth event"
+
+
+def test_stale_base_header_is_not_replayed(make_client):
+    client = make_client()
+    client.set_current_goal("Start")
+    client.add_conversation_entry("user", "only once")
+
+    # A compaction that crashed after rewriting the context file but before
+    # emptying the log: the log's header names the old context file
+    log = _read(client.log_file)
+    client._write_snapshot(client._get_context())
+    with open(client.log_file, "wb") as f:
+        f.write(log)
+
+    fresh = make_client()
+    history = fresh.get_full_context()["conversation_history"]
+    assert [entry["content"] for entry in history] == ["only once"]
+    assert fresh._log_stale
+
+    # The next event starts a new log rather than extending the stale one
+    fresh.add_next_step("after the crash")
+    assert not fresh._log_stale
+    context = make_client().get_full_context()
+    assert [entry["content"] for entry in context["conversation_history"]] == ["only once"]
+    assert context["next_steps"][-1] == "after the crash"
+
+
+def test_compaction_by_another_client_forces_a_full_reload(make_client):
+    writer = make_client()
+    writer.set_current_goal("Start")
+    writer.add_next_step("logged")
+    reader = make_client()
+    assert reader.get_full_context()["next_steps"][-1] == "logged"
+
+    writer.close()  # Folds the log into a rewritten context file
+    writer.add_next_step("after compaction")
+
+    context = reader.get_full_context()
+    assert context["next_steps"].count("logged") == 1
+    assert context["next_steps"][-1] == "after compaction"
+    assert reader._context_stat == writer._context_stat
+
+
+def test_truncated_trailing_line_is_picked_up_once_complete(make_client):
+    writer = make_client()
+    writer.set_current_goal("Start")
+    writer.add_next_step("complete")
+    writer.add_next_step("being written")
+
+    # Cut the last event short, as if its write were still in progress
+    log = _read(writer.log_file)
+    head, last = log[:-1].rsplit(b"\n", 1)
+    with open(writer.log_file, "wb") as f:
+        f.write(head + b"\n" + last[:10])
+
+    reader = make_client()
+    assert reader.get_full_context()["next_steps"][-1] == "complete"
+
+    with open(writer.log_file, "ab") as f:
+        f.write(last[10:] + b"\n")
+
+    assert reader.get_full_context()["next_steps"][-2:] == ["complete", "being written"]
+
+
+def test_torn_line_is_skipped(make_client):
+    writer = make_client()
+    writer.set_current_goal("Start")
+    writer.add_next_step("before")
+    with open(writer.log_file, "ab") as f:
+        f.write(b'{"op": "add_next_st\n')
+
+    reader = make_client()
+    reader.add_next_step("after")
+
+    assert make_client().get_full_context()["next_steps"][-2:] == ["before", "after"]
+
+
+@pytest.fixture
+def appends(monkeypatch):
+    """Count event log appends made by any client."""
+    calls = []
+    append_events = ContextManagerClient._append_events
+
+    def counting(self, events):
+        calls.append(len(events))
+        return append_events(self, events)
+    monkeypatch.setattr(ContextManagerClient, "_append_events", counting)
+    return calls
+
+
+def test_transaction_saves_once_on_exit(make_client, appends):
+    client = make_client()
+    client.set_current_goal("Start")
+
+    with client.transaction():
+        client.set_current_goal("Inside")
+        client.add_next_step("one")
+        client.add_next_step("two")
+        assert appends == []
+        assert client.get_full_context()["current_goal"] == "Inside"
+
+    assert appends == [3]
+    context = make_client().get_full_context()
+    assert context["current_goal"] == "Inside"
+    assert context["next_steps"][-2:] == ["one", "two"]
+
+
+def test_nested_transaction_joins_the_outer_one(make_client, appends):
+    client = make_client()
+    client.set_current_goal("Start")
+
+    with client.transaction():
+        client.add_next_step("outer")
+        with client.transaction():
+            client.add_next_step("inner")
+        assert appends == []
+
+    assert appends == [2]
+    assert make_client().get_full_context()["next_steps"][-2:] == ["outer", "inner"]
+
+
+def test_transaction_saves_changes_made_before_an_exception(make_client, appends):
+    client = make_client()
+    client.set_current_goal("Start")
+
+    with pytest.raises(RuntimeError):
+        with client.transaction():
+            client.set_current_goal("Kept")
+            raise RuntimeError("boom")
+
+    assert appends == [1]
+    assert make_client().get_full_context()["current_goal"] == "Kept"
+    # Mutations after the block are saved on their own again
+    client.add_next_step("after")
+    assert appends == [1, 1]
+
+
+def test_summary_is_current_inside_a_transaction(make_client):
+    client = make_client()
+    client.set_current_goal("Start")
+    steps = client.get_context_summary()["next_steps_count"]
+
+    with client.transaction():
+        client.set_current_goal("Inside")
+        client.add_next_step("counted")
+        summary = client.get_context_summary()
+        assert summary["current_goal"] == "Inside"
+        assert summary["next_steps_count"] == steps + 1
+
+    assert client.get_context_summary() == summary
+
+
+@pytest.fixture
+def disk_full(monkeypatch):
+    """Make event log appends fail while the returned flag list holds True."""
+    failing = [True]
+    append_events = ContextManagerClient._append_events
+
+    def append(self, events):
+        if failing[0]:
+            raise OSError(28, "No space left on device")
+        return append_events(self, events)
+    monkeypatch.setattr(ContextManagerClient, "_append_events", append)
+    return failing
+
+
+def test_failed_append_is_not_kept_in_the_cache(make_client, disk_full):
+    client = make_client()
+    client.set_current_goal("Saved")  # Writes the context file; not logged
+    assert client.set_current_goal("Lost") is False
+    assert client.add_next_step("lost step") is False
+
+    context = client.get_full_context()
+    assert context["current_goal"] == "Saved"
+    assert "lost step" not in context["next_steps"]
+    assert client.get_context_summary()["current_goal"] == "Saved"
+
+    # Later writes do not bring the failed ones back
+    disk_full[0] = False
+    client.add_next_step("next step")
+    client.close()
+    context = make_client().get_full_context()
+    assert context["current_goal"] == "Saved"
+    assert context["next_steps"][-1] == "next step"
+    assert "lost step" not in context["next_steps"]
+
+
+def test_failed_transaction_save_is_not_kept_in_the_cache(make_client, disk_full):
+    client = make_client()
+    client.set_current_goal("Saved")
+
+    with pytest.raises(OSError):
+        with client.transaction():
+            client.set_current_goal("Lost")
+
+    assert client.get_full_context()["current_goal"] == "Saved"
@@ -0,0 +1,143 @@
+"""Tests for the SQLite context backend, checked against the JSON backend."""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pytest
+
+from mcp_integration import context_manager_client as cmc
+from mcp_integration import context_sqlite
+from mcp_integration.context_manager_client import ContextManagerClient
+
+
+class _FixedDatetime(datetime):
+    """datetime whose now() never moves, so both backends stamp the same times."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """Build offline clients whose background writes run inline and whose clock is fixed."""
+    monkeypatch.setattr(cmc, "_probe_mcp_server", lambda server_url: False)
+    monkeypatch.setattr(cmc, "_submit_write", lambda client, method: getattr(client, method)())
+    monkeypatch.setattr(cmc, "datetime", _FixedDatetime)
+    monkeypatch.setattr(context_sqlite, "datetime", _FixedDatetime)
+
+    def make(backend="sqlite", root="project"):
+        return ContextManagerClient("demo", project_root=str(tmp_path / root), backend=backend)
+    return make
+
+
+def _seed(client):
+    client.set_current_goal("Quote retaining walls")
+    client.add_completed_feature("Wall calculator")
+    client.add_current_issue("Slow quotes", location="app.py", root_cause="N+1 queries")
+    client.add_next_step("Cache materials")
+    client.add_context_anchor("db", "postgres", "Primary database")
+    client.add_conversation_entry("user", "hello")
+
+
+MUTATIONS = {
+    "set_current_goal": lambda c: c.set_current_goal("Deploy"),
+    "add_completed_feature": lambda c: c.add_completed_feature("Batch quotes"),
+    "add_completed_feature_duplicate": lambda c: c.add_completed_feature("Wall calculator"),
+    "add_current_issue": lambda c: c.add_current_issue("Timeouts", status="investigating"),
+    "add_next_step": lambda c: c.add_next_step("Load test"),
+    "add_next_step_duplicate": lambda c: c.add_next_step("Cache materials"),
+    "add_context_anchor": lambda c: c.add_context_anchor("cache", "redis", priority=2),
+    "add_context_anchor_replace": lambda c: c.add_context_anchor("db", "sqlite", "Local database"),
+    "update_current_state": lambda c: c.update_current_state({"development_phase": "Beta", "build": 7}),
+    "update_current_state_unchanged": lambda c: c.update_current_state({}),
+    "add_conversation_entries": lambda c: c.add_conversation_entries(
+        [{"role": "user", "content": f"message {i}", "metadata": {"i": i}} for i in range(60)]),
+    "clear_issues": lambda c: c.clear_issues(),
+    "mark_issue_resolved": lambda c: c.mark_issue_resolved("Slow quotes"),
+    "mark_issue_resolved_unknown": lambda c: c.mark_issue_resolved("No such issue"),
+}
+
+
+@pytest.mark.parametrize("mutation", sorted(MUTATIONS))
+def test_mutator_matches_json_backend(make_client, mutation):
+    json_client = make_client("json", root="json")
+    sqlite_client = make_client("sqlite", root="sqlite")
+    for client in (json_client, sqlite_client):
+        _seed(client)
+        assert MUTATIONS[mutation](client) is True
+
+    assert sqlite_client.get_full_context() == json_client.get_full_context()
+    assert sqlite_client.get_context_summary() == json_client.get_context_summary()
+
+
+def test_json_context_is_imported_on_first_connection(make_client):
+    json_client = make_client("json")
+    _seed(json_client)
+    json_client.add_next_step("Logged, not yet compacted")
+    expected = json_client.get_full_context()
+
+    client = make_client("sqlite")
+    assert not client.db_file.exists()
+    assert client.get_full_context() == expected
+    assert client.db_file.exists()
+
+    # Later connections use the database, not the JSON file
+    json_client.set_current_goal("Changed in JSON only")
+    client.close()
+    assert make_client("sqlite").get_full_context() == expected
+
+
+def test_new_project_starts_from_default_context(make_client):
+    assert make_client("sqlite").get_full_context() == make_client("json", root="json").get_full_context()
+
+
+def _stored_goal(client):
+    """Read current_goal through a separate connection, as another process would."""
+    with closing(sqlite3.connect(client.db_file)) as db:
+        return cmc._loads(db.execute("SELECT value FROM meta WHERE key = 'current_goal'").fetchone()[0])
+
+
+def test_transaction_commits_on_exit(make_client):
+    client = make_client()
+    client.set_current_goal("Before")
+
+    with client.transaction():
+        client.set_current_goal("Inside")
+        client.add_next_step("Also inside")
+        # Not visible to other connections until the block exits
+        assert _stored_goal(client) == "Before"
+        assert client.get_full_context()["current_goal"] == "Inside"
+
+    assert _stored_goal(client) == "Inside"
+    assert make_client().get_full_context()["next_steps"][-1] == "Also inside"
+
+
+def test_nested_transaction_joins_the_outer_one(make_client):
+    client = make_client()
+    client.set_current_goal("Before")
+
+    with client.transaction():
+        with client.transaction():
+            client.set_current_goal("Nested")
+        assert _stored_goal(client) == "Before"
+
+    assert _stored_goal(client) == "Nested"
+
+
+def test_transaction_commits_even_on_exception(make_client):
+    client = make_client()
+    client.set_current_goal("Before")
+
+    with pytest.raises(RuntimeError):
+        with client.transaction():
+            client.set_current_goal("Kept")
+            client.add_next_step("Also kept")
+            raise RuntimeError("boom")
+
+    assert _stored_goal(client) == "Kept"
+    assert make_client().get_full_context()["next_steps"][-1] == "Also kept"
+    # The connection is usable afterwards
+    assert client.add_next_step("After") is True
+    assert make_client().get_full_context()["next_steps"][-1] == "After"
@@ -0,0 +1,36 @@
+"""Tests for the wall materials calculator, using the built-in fallback materials."""
+
+import pytest
+
+from landscaping_materials import LandscapingMaterials
+
+
+@pytest.fixture
+def materials():
+    return LandscapingMaterials()
+
+
+@pytest.mark.parametrize("include_base, include_cap", [(True, True), (False, False), (True, False)])
+def test_batch_matches_single_calculations(materials, include_base, include_cap):
+    walls = [(20, 4, "concrete_block"), (10.5, 2.5, "brick"), (20, 4, "concrete_block"),
+             (33, 7, "natural_stone"), (0.5, 0.25, "brick")]
+
+    batch = materials.calculate_wall_materials_batch(walls, include_base, include_cap)
+
+    assert batch == [materials.calculate_wall_materials(length, height, material_id, include_base, include_cap)
+                     for length, height, material_id in walls]
+
+
+def test_batch_results_do_not_share_sections(materials):
+    first, second = materials.calculate_wall_materials_batch([(20, 4, "brick"), (20, 4, "brick")])
+    first["primary_material"]["name"] = "Changed"
+    first["installation_notes"].append("Changed")
+
+    assert second["primary_material"]["name"] == "Red Clay Brick"
+    assert "Changed" not in second["installation_notes"]
+    assert materials.calculate_wall_materials_batch([(20, 4, "brick")])[0]["primary_material"]["name"] == "Red Clay Brick"
+
+
+def test_batch_with_unknown_material_raises(materials):
+    with pytest.raises(ValueError):
+        materials.calculate_wall_materials_batch([(20, 4, "brick"), (20, 4, "no_such_material")])